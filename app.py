@@ -1,22 +1,27 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pickle
-import os
-import streamlit.components.v1 as components
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from io import BytesIO
-import matplotlib
-matplotlib.use("Agg")
+import time
+from src.resources import load_model, load_dataset, dataset_version, model_version, cache_stats
+from src.prediction_cache import feature_key, get_or_compute, prediction_cache_stats
+from src.charts import chart_cache_stats, status_counts_png, income_vs_loan_png, education_counts_png, income_histogram_png, filtered_histogram_png, what_if_png
+from src.dashboard_snapshot import load_snapshot
+from src.dashboard_index import load_index
+from src.reports import cached_pdf, report_key
+from src.instrumentation import DEBUG_TIMINGS, export_metrics, record, timed
+from src.explanations import describe
+from src.prediction_log import log_prediction
+from src.drift_monitor import drift_report, update as update_drift
+from src.worker_pool import PoolBusy, score as score_in_pool, start as start_worker_pool
+from src.what_if import DEFAULT_POINTS, SWEEP_FEATURES, decision_boundary, default_range, grid_values, sweep
+from src.decision_rules import APPROVAL_THRESHOLD, apply_decision_rules, approved_class_index
+
+# load_dataset() hands every session a view of one cached frame;
+# copy-on-write keeps an in-place change on one view from reaching the others.
+pd.set_option("mode.copy_on_write", True)
 
 # Streamlit Page Config
 st.set_page_config(page_title="Loan approval prediction", layout="centered")
 
-education_map = {"Graduate": 1, "Not Graduate": 0}
-self_employed_map = {"Yes": 1, "No": 0}
-
 
 if "page" not in st.session_state:
     st.session_state.page = "Home"
@@ -25,104 +30,17 @@ try:
     params = st.query_params
     if "page" in params:
         st.session_state.page = params["page"]
+    if params.get("debug") == "timings":
+        DEBUG_TIMINGS = True
 except:
     pass
 
 
-def generate_pdf(dataframe, approved, risk):
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    # Header background
-    c.setFillColorRGB(0.08, 0.72, 0.65)
-    c.rect(0, height - 80, width, 80, fill=1, stroke=0)
-
-    # Title
-    c.setFillColorRGB(1, 1, 1)
-    c.setFont("Helvetica-Bold", 22)
-    c.drawString(50, height - 50, "Loan Prediction Report")
-
-    c.setFillColorRGB(0, 0, 0)
-
-    # Loan Status
-    c.setFont("Helvetica-Bold", 14)
-    status_text = "LOAN APPROVED " if approved else "LOAN REJECTED "
-    c.drawString(50, height - 120, status_text)
-
-    # Risk level
-    c.setFont("Helvetica", 12)
-    c.drawString(50, height - 145, f"Risk Level: {risk}")
-
-    # Divider
-    c.line(50, height - 155, width - 50, height - 155)
-
-    # Applicant Details
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(50, height - 185, "Applicant Details")
-
-    y = height - 215
-    for col, val in dataframe.iloc[0].items():
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(60, y, f"{col}:")
-        c.setFont("Helvetica", 11)
-        c.drawString(220, y, str(val))
-        y -= 20
-
-    # Positive Factors
-    y -= 15
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(50, y, "Positive Factors")
-    y -= 18
-
-    c.setFont("Helvetica", 11)
-    c.drawString(60, y, "- Good credit score")
-    y -= 15
-    c.drawString(60, y, "- Stable income")
-    y -= 15
-    c.drawString(60, y, "- Asset backing")
-
-    # Areas for Improvement
-    y -= 25
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(50, y, "Areas for Improvement")
-    y -= 18
-
-    c.setFont("Helvetica", 11)
-    if approved:
-        c.drawString(60, y, "No significant concerns identified.")
-    else:
-        c.drawString(60, y, "- Improve credit score")
-        y -= 15
-        c.drawString(60, y, "- Reduce loan amount")
-        y -= 15
-        c.drawString(60, y, "- Increase income stability")
-
-    # Footer
-    c.setFont("Helvetica-Oblique", 9)
-    c.setFillColorRGB(0.4, 0.4, 0.4)
-    c.drawString(
-        50,
-        40,
-        "This report is system generated based on the applicant's submitted information."
-    )
-
-    c.save()
-    buffer.seek(0)
-    return buffer
-
-
-# Load Model & Dataset
-df = pd.read_csv("data/loan_data.csv") 
-MODEL_PATH = os.path.join("models", "loan_model.pkl")
-
-with open(MODEL_PATH, "rb") as f:
-    model = pickle.load(f)
-
-try:
-    expected_features = model.feature_names_in_
-except:
-    expected_features = df.drop("loan_status", axis=1).columns
+# Load Model & Dataset (cached per server process, reloaded only when the files change)
+df = load_dataset()
+model = load_model()
+# Scoring and PDFs run in worker processes shared by all sessions
+start_worker_pool()
                     
 # Global Styling
 
@@ -344,6 +262,20 @@ page = st.sidebar.radio(
 )
 st.session_state.page = page
 
+with st.sidebar.expander("Resource cache"):
+    for name, stats in cache_stats().items():
+        st.caption(
+            f"{name}: {stats['hits']} hits / {stats['misses']} misses, "
+            f"loaded in {stats['load_seconds'] * 1000:.1f} ms"
+        )
+    charts = chart_cache_stats()
+    st.caption(f"charts: {charts['hits']} hits / {charts['misses']} misses, {charts['entries']} cached")
+    predictions = prediction_cache_stats()
+    st.caption(
+        f"predictions: {predictions['hit_rate']:.0%} hit rate, "
+        f"{predictions['entries']} cached"
+    )
+
 
 # HOME PAGE
 if page == "Home":
@@ -439,9 +371,12 @@ elif page == "Loan Prediction":
 
     # RESULTS
     if submitted:
-        input_df = pd.DataFrame([{
-            "education": education_map[education],
-            "self_employed": self_employed_map[self_employed],
+        # Per-stage timings for this request (exported and, in debug mode,
+        # shown under the result)
+        timings = {}
+        features = {
+            "education": education,
+            "self_employed": self_employed,
             "no_of_dependents": no_of_dependents,
             "income_annum": income_annum,
             "loan_amount": loan_amount,
@@ -451,31 +386,70 @@ elif page == "Loan Prediction":
             "commercial_assets_value": commercial_assets_value,
             "luxury_assets_value": luxury_assets_value,
             "bank_asset_value": bank_asset_value
-        }])
-        input_df = input_df.reindex(columns=expected_features, fill_value=0)
-        proba = model.predict_proba(input_df)[0]
-        classes = list(model.classes_)
-        approved_idx = classes.index("Approved") if "Approved" in classes else 1
-        approved_prob = proba[approved_idx] * 100
+        }
+
+        def score_applicant():
+            # Scored in the shared worker pool (src/worker_pool.py), which
+            # reports the time of each stage back
+            input_df, proba, explanation, stages = score_in_pool(features)
+            for stage, seconds in stages.items():
+                record(stage, seconds, timings)
+            return input_df, proba, explanation
+
+        # Resubmitting a recently scored applicant skips all four stages
+        try:
+            with timed("prediction_lookup", timings):
+                input_df, proba, explanation = get_or_compute(features, model_version(), score_applicant)
+        except (PoolBusy, TimeoutError):
+            st.error("The system is busy scoring other applications. Please submit again in a moment.")
+            st.stop()
+        approved_prob = proba[approved_class_index(model)] * 100
+        interest_rate = 9.5 if approved_prob >= APPROVAL_THRESHOLD else 11.5
+
+        # Risk band and extreme edge cases (shared with batch scoring)
+        approved_prob, approved, risk = apply_decision_rules(
+            approved_prob, income_annum, no_of_dependents, loan_amount
+        )
+        approved_prob, approved, risk = float(approved_prob), bool(approved), str(risk)
         rejection_prob = 100 - approved_prob
-        approved = approved_prob >= 0.70
-        if approved_prob >= 80:
-            risk = "Low"
-        elif approved_prob >= 60:
-            risk = "Medium"
-        else:
-            risk = "High"
 
-        monthly_payment = loan_amount / loan_term
-        interest_rate = 9.5 if approved else 11.5
+        # Append-only log of every decision (see src/prediction_log.py)
+        with timed("log_prediction", timings):
+            record_id = log_prediction(features, approved_prob, approved, risk, model_version())
+        # Live feature sketches for the Dashboard's drift table
+        with timed("update_drift", timings):
+            update_drift(features)
 
-         # Extreme edge cases handling
+        monthly_payment = loan_amount / loan_term
 
-        if ( income_annum < 50000 and no_of_dependents >= 5 and loan_amount > 10 * income_annum ):
-            approved = False
-            approved_prob = min(approved_prob, 35)
-            rejection_prob = 100 - approved_prob
-            risk = "High"
+        # Kept in the session so the results survive the rerun triggered
+        # by the report button below.
+        st.session_state.prediction = {
+            "input_df": input_df,
+            "approved_prob": approved_prob,
+            "rejection_prob": rejection_prob,
+            "approved": approved,
+            "risk": risk,
+            "monthly_payment": monthly_payment,
+            "interest_rate": interest_rate,
+            "explanation": explanation,
+            "record_id": record_id,
+            "timings": timings,
+        }
+
+    prediction = st.session_state.get("prediction")
+    if prediction is not None:
+        input_df = prediction["input_df"]
+        approved_prob = prediction["approved_prob"]
+        rejection_prob = prediction["rejection_prob"]
+        approved = prediction["approved"]
+        risk = prediction["risk"]
+        monthly_payment = prediction["monthly_payment"]
+        interest_rate = prediction["interest_rate"]
+        explanation = prediction["explanation"]
+        timings = prediction["timings"]
+
+        render_start = time.perf_counter()
 
         # Result card
         st.markdown(f"""
@@ -508,6 +482,8 @@ elif page == "Loan Prediction":
 
         st.progress(approved_prob / 100)
         st.caption("Approval Confidence")
+        if prediction.get("record_id"):
+            st.caption(f"Decision reference: {prediction['record_id']}")
 
         # METRICS
         st.markdown(f"""
@@ -527,20 +503,18 @@ elif page == "Loan Prediction":
         </div>
         """, unsafe_allow_html=True)
 
-        # INSIGHTS
-        st.markdown("""
+        # INSIGHTS (the model's strongest drivers for this applicant)
+        positive_items = "".join(f"<li>{describe(d)}</li>" for d in explanation["positive"])
+        st.markdown(f"""
         <h4 class="good">
                     <i class="fa-solid fa-circle-check"></i> Positive Factors
         </h4>
-        <ul>
-            <li>Good credit score</li>
-            <li>Stable income</li>
-            <li>Asset backing</li>
-        </ul>
+        {f"<ul>{positive_items}</ul>" if positive_items else
+         "<p>No strong positive factors identified.</p>"}
         """, unsafe_allow_html=True)
 
-        # AREAS FOR IMPROVEMENT (CONDITIONAL)
-        if approved:
+        # AREAS FOR IMPROVEMENT
+        if not explanation["negative"]:
             st.markdown("""
             <h4 class="good">
                         <i class="fa-solid fa-thumbs-up"></i> Areas for Improvement
@@ -549,36 +523,102 @@ elif page == "Loan Prediction":
             """, unsafe_allow_html=True)
 
         else:
-            st.markdown("""
+            negative_items = "".join(f"<li>{describe(d)}</li>" for d in explanation["negative"])
+            st.markdown(f"""
             <h4 class="bad">
                         <i class="fa-solid fa-triangle-exclamation"></i> Areas for Improvement
             </h4>
-            <ul>
-                <li>High existing debt burden</li>
-                <li>Loan amount exceeds recommended limits</li>
-                <li>High loan-to-value ratio</li>
-            </ul>
+            <ul>{negative_items}</ul>
             """, unsafe_allow_html=True)
             
+        record("render_html", time.perf_counter() - render_start, timings)
+
+        # WHAT-IF ANALYSIS
+        # The whole grid is scored in one batched call; the result is kept
+        # in the session so it survives reruns from the buttons below.
+        applicant = input_df.iloc[0].to_dict()
+        with st.expander("What-if analysis"):
+            with st.form("what_if_form"):
+                swept = st.multiselect("Features to vary", SWEEP_FEATURES,
+                                       default=["loan_amount"], max_selections=2)
+                spans = {}
+                snapshot = load_snapshot()
+                for feature in swept:
+                    low, high = default_range(feature, applicant[feature], snapshot)
+                    spans[feature] = st.slider(feature, float(low), float(high),
+                                               (float(low), float(high)))
+                run_what_if = st.form_submit_button("Run What-if")
+
+            if run_what_if and swept:
+                points = DEFAULT_POINTS[len(swept)]
+                axes = {f: grid_values(f, *spans[f], points) for f in swept}
+                with timed("what_if", timings):
+                    result = sweep(model, applicant, axes)
+                st.session_state.what_if = {
+                    "applicant": feature_key(applicant),
+                    "key": (model_version(), feature_key(applicant),
+                            tuple((f, tuple(v)) for f, v in axes.items())),
+                    "result": result,
+                    "boundary": decision_boundary(result),
+                }
+
+            what_if = st.session_state.get("what_if")
+            if what_if is not None and what_if["applicant"] == feature_key(applicant):
+                result, boundary = what_if["result"], what_if["boundary"]
+                st.image(what_if_png(what_if["key"], result, boundary), use_column_width="never")
+                if not boundary:
+                    st.caption("The decision is the same across the whole grid: "
+                               + ("approved." if result["approved"].all() else "rejected."))
+                elif len(result["features"]) == 1:
+                    for crossing in boundary:
+                        st.write(f"{result['features'][0]} ≈ {crossing['value']:,.0f}: "
+                                 + ("becomes approved" if crossing["becomes_approved"] else "becomes rejected"))
+                else:
+                    st.dataframe(pd.DataFrame(boundary).rename(columns={"value": result["features"][0]}),
+                                 hide_index=True)
+
         # ACTION BUTTONS 
         left, center1, center2, right = st.columns([2, 2, 2, 2])
 
         with center1:
             st.markdown('<div class="action-btn">', unsafe_allow_html=True)
             if st.button("Start New Application"):
+                st.session_state.pop("prediction", None)
+                st.session_state.pop("what_if", None)
                 st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
         with center2:
-            pdf_file = generate_pdf(input_df, approved, risk)
+            # The PDF is only built once the report is asked for, and is
+            # memoized by applicant inputs and decision.
+            report_id = report_key(input_df, approved, risk, explanation)
             st.markdown('<div class="action-btn">', unsafe_allow_html=True)
-            st.download_button(
-                "Download Report",
-                data=pdf_file,
-                file_name="loan_report.pdf",
-                mime="application/pdf"
-            )
+            if st.session_state.get("report_id") == report_id:
+                try:
+                    with timed("generate_pdf", timings):
+                        pdf_bytes = cached_pdf(input_df, approved, risk, explanation)
+                except (PoolBusy, TimeoutError):
+                    pdf_bytes = None
+                    st.warning("The report could not be prepared right now. Please try again.")
+                if pdf_bytes is not None:
+                    st.download_button(
+                        "Download Report",
+                        data=pdf_bytes,
+                        file_name="loan_report.pdf",
+                        mime="application/pdf"
+                    )
+            elif st.button("Prepare Report"):
+                st.session_state.report_id = report_id
+                st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
 
+        export_metrics()
+        if DEBUG_TIMINGS:
+            st.write("#### Timing breakdown")
+            st.table(pd.DataFrame(
+                {"milliseconds": [seconds * 1000 for seconds in timings.values()]},
+                index=list(timings),
+            ))
+
 # DASHBOARD PAGE
 
 elif page == "Dashboard":
@@ -588,33 +628,65 @@ elif page == "Dashboard":
     </h2>
     """, unsafe_allow_html=True)
 
-    total = len(df)
-    df.columns = df.columns.str.strip()
-    df["loan_status"] = df["loan_status"].str.strip().str.capitalize()
-    approved = len(df[df["loan_status"] == "Approved"])
-    rejected = len(df[df["loan_status"] == "Rejected"])
-    approval_rate = round((approved / total) * 100, 2) 
-    rejection_rate = round((rejected / total) * 100, 2) 
+    snapshot = load_snapshot()
+    index = load_index()
+    version = dataset_version()
+
+    # Filters are answered from the precomputed index, not by masking df
+    st.write("### Filters")
+    cibil_bounds = index.bounds("cibil_score")
+    loan_bounds = index.bounds("loan_amount")
+    f1, f2 = st.columns(2)
+    cibil_range = f1.slider("CIBIL Score", *cibil_bounds, value=cibil_bounds)
+    loan_range = f2.slider("Loan Amount", *loan_bounds, value=loan_bounds, step=100000)
+    education_filter = f1.multiselect("Education", index.category_values("education"))
+    self_employed_filter = f2.multiselect("Self Employed", index.category_values("self_employed"))
+
+    ranges = {"cibil_score": cibil_range, "loan_amount": loan_range}
+    categories = {"education": education_filter, "self_employed": self_employed_filter}
+    filters = (cibil_range, loan_range, tuple(education_filter), tuple(self_employed_filter))
+    filtered = filters != (cibil_bounds, loan_bounds, (), ())
+    summary = index.query(ranges, categories) if filtered else snapshot
 
     st.write("### Key Metrics")
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Applications", total)
-    col2.metric("Approval Rate", f"{approval_rate}%")
-    col3.metric("Rejection Rate", f"{rejection_rate}%")
+    col1.metric("Total Applications", summary["total"])
+    col2.metric("Approval Rate", f"{summary['approval_rate']}%")
+    col3.metric("Rejection Rate", f"{summary['rejection_rate']}%")
 
     st.write("---")
     st.write("### Income Distribution")
-    fig, ax = plt.subplots(figsize=(5,3.5), dpi=100)
-    df.columns = df.columns.str.strip()
-    sns.histplot(df["income_annum"], ax=ax)
-    plt.tight_layout()
-    st.pyplot(fig, use_container_width=False)
+    if filtered:
+        st.image(filtered_histogram_png(version, filters, summary["histogram"]), use_column_width="never")
+    else:
+        st.image(income_histogram_png(version, snapshot), use_column_width="never")
+
+    # Scored applications against the training data, from the binned
+    # sketches in src/drift_monitor.py rather than any raw rows
+    st.write("---")
+    st.write("### Feature Drift")
+    drift = drift_report()
+    st.caption(f"{drift['live_rows']:,} applications scored since {drift['since']}, "
+               f"compared with {drift['reference_rows']:,} training rows")
+    if drift["live_rows"]:
+        st.dataframe(pd.DataFrame([
+            {
+                "Feature": row["feature"],
+                "PSI": round(row["psi"], 4),
+                "KS": None if row["ks"] is None else round(row["ks"], 4),
+                "Status": row["status"],
+            }
+            for row in drift["features"]
+        ]), hide_index=True)
+    else:
+        st.info("No applications have been scored since monitoring started.")
 
 
 # INSIGHTS PAGE (VISUAL GRAPHS)
 
 elif page == "Insights":
-    df.columns = df.columns.str.strip()
+    snapshot = load_snapshot()
+    version = dataset_version()
     st.markdown("""
     <h2>
     <i class="fa-solid fa-chart-column"></i> Visual Insights
@@ -624,30 +696,14 @@ elif page == "Insights":
 
     # Graph 1
     st.write("### Loan Approval Distribution")
-    fig1, ax1 = plt.subplots(figsize=(5,3.5), dpi=120)
-    sns.countplot(x="loan_status", data=df, ax=ax1)
-    plt.tight_layout()
-    st.pyplot(fig1, use_container_width=False)
+    st.image(status_counts_png(version, snapshot), use_column_width="never")
 
     st.write("---")
-    # Graph 2
+    # Graph 2 (2-D density instead of a scatter on very large datasets)
     st.write("### Applicant Income vs Loan Amount")
-    fig2, ax2 = plt.subplots(figsize=(5,3.5), dpi=120)
-    sns.scatterplot(
-        x="income_annum",
-        y="loan_amount",
-        hue="loan_status",
-        data=df,
-        ax=ax2
-    )
-    plt.tight_layout()
-    st.pyplot(fig2, use_container_width=False)
+    st.image(income_vs_loan_png(version, df), use_column_width="never")
 
     st.write("---")
     # Graph 3
     st.write("### Education-wise Loan Approval")
-    fig3, ax3 = plt.subplots(figsize=(5,3.5), dpi=120)
-    sns.countplot(x="education", hue="loan_status", data=df, ax=ax3)
-    plt.tight_layout()
-    st.pyplot(fig3, use_container_width=False)
-
+    st.image(education_counts_png(version, snapshot), use_column_width="never")
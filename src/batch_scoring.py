@@ -0,0 +1,202 @@
+# batch_scoring.py
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data_loading import read_loan_csv
+from src.drift_monitor import flush as flush_drift, update as update_drift
+from src.decision_rules import apply_decision_rules, approved_class_index
+from src.resources import MODEL_PATH, load_model
+
+DEFAULT_CHUNKSIZE = 50_000
+ID_COLUMN = "loan_id"
+OUTPUT_COLUMNS = ["approval_probability", "decision", "risk_band"]
+
+# float32 mode: rows per chunk that are also scored in float64, and the
+# largest difference (in percentage points) for which the float32
+# probabilities are kept. A chunk over the tolerance is rescored in
+# float64. LOAN_FLOAT32_CHECK_ROWS=0 checks every row.
+FLOAT32_TOLERANCE = float(os.environ.get("LOAN_FLOAT32_TOLERANCE", "0.001"))
+FLOAT32_CHECK_ROWS = int(os.environ.get("LOAN_FLOAT32_CHECK_ROWS", "1000"))
+
+_worker_model = None
+_worker_float32 = None
+
+
+def expected_features(model, frame=None):
+    try:
+        return model.feature_names_in_
+    except AttributeError:
+        return frame.columns.drop([ID_COLUMN, "loan_status"], errors="ignore")
+
+
+def score_frame(model, frame, explain=0):
+    # Scores a frame of applications with the same rules as the form.
+    # Approval probabilities are percentages, like on the result card.
+    # explain > 0 adds the names of that many top positive and negative
+    # drivers per row (see src.explanations).
+    features = frame.reindex(columns=expected_features(model, frame), fill_value=0)
+    proba = model.predict_proba(features)[:, approved_class_index(model)] * 100
+    return _decide(model, frame, features, proba, explain)
+
+
+def _decide(model, frame, features, proba, explain):
+    approved_prob, approved, risk = apply_decision_rules(
+        proba,
+        features["income_annum"].to_numpy(),
+        features["no_of_dependents"].to_numpy(),
+        features["loan_amount"].to_numpy(),
+    )
+
+    result = pd.DataFrame({
+        "approval_probability": approved_prob,
+        "decision": np.where(approved, "Approved", "Rejected"),
+        "risk_band": risk,
+    }, index=frame.index)
+    if explain:
+        from src.explanations import explain_frame
+        result = result.join(explain_frame(model, features, explain))
+    if ID_COLUMN in frame.columns:
+        result.insert(0, ID_COLUMN, frame[ID_COLUMN].to_numpy())
+    return result
+
+
+def float32_scorer(model):
+    # None when the model does not fold into the NumPy kernel (non-linear
+    # engines); those are always scored in float64.
+    from src.engines import is_linear
+    from src.fast_scorer import Float32Scorer, LinearScorer, export_scorer
+
+    if not is_linear(model):
+        return None
+    return Float32Scorer(model if isinstance(model, LinearScorer) else export_scorer(model))
+
+
+def score_frame_float32(model, scorer, frame, explain=0,
+                        tolerance=FLOAT32_TOLERANCE, check_rows=FLOAT32_CHECK_ROWS):
+    # Returns (result, largest deviation on the checked rows, whether the
+    # float32 probabilities were kept).
+    features = frame.reindex(columns=expected_features(model, frame), fill_value=0)
+    proba = scorer.positive_probability(features)
+    if approved_class_index(model) == 0:
+        np.subtract(1, proba, out=proba)
+    proba *= 100
+
+    step = max(1, len(frame) // check_rows) if check_rows else 1
+    checked = features.iloc[::step]
+    reference = model.predict_proba(checked)[:, approved_class_index(model)] * 100
+    deviation = float(np.max(np.abs(proba[::step] - reference))) if len(checked) else 0.0
+    if deviation > tolerance:
+        return score_frame(model, frame, explain), deviation, False
+    return _decide(model, frame, features, proba, explain), deviation, True
+
+
+def _init_worker(model_path, precision="float64"):
+    global _worker_model, _worker_float32
+    _worker_model = load_model(model_path)
+    _worker_float32 = float32_scorer(_worker_model) if precision == "float32" else None
+
+
+def _score_chunk(chunk, explain=0):
+    if _worker_float32 is not None:
+        return score_frame_float32(_worker_model, _worker_float32, chunk, explain)
+    return score_frame(_worker_model, chunk, explain), None, False
+
+
+def score_csv(input_path, output_path, model_path=MODEL_PATH,
+              chunksize=DEFAULT_CHUNKSIZE, workers=None, explain=0, monitor_drift=True,
+              precision="float64"):
+    # monitor_drift adds every chunk to the live drift sketches; turn it
+    # off when rescoring data that is not new applications (backtests).
+    # precision="float32" scores through Float32Scorer where the model
+    # allows it, checking each chunk against float64 (see
+    # score_frame_float32).
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    rows = 0
+    header = True
+    float32 = {"chunks": 0, "float64_chunks": 0, "max_deviation": None}
+
+    def write(scored):
+        nonlocal rows, header
+        result, deviation, kept = scored
+        result.to_csv(output_path, mode="w" if header else "a", header=header, index=False)
+        rows += len(result)
+        header = False
+        if deviation is not None:
+            float32["chunks"] += 1
+            float32["float64_chunks"] += not kept
+            float32["max_deviation"] = max(float32["max_deviation"] or 0.0, deviation)
+
+    if workers == 1:
+        _init_worker(model_path, precision)
+        for chunk in read_loan_csv(input_path, chunksize=chunksize):
+            write(_score_chunk(chunk, explain))
+            if monitor_drift:
+                update_drift(chunk)
+    else:
+        # At most two chunks per worker are in flight, so memory stays
+        # bounded by the chunk size whatever the size of the input file.
+        # Results are written oldest-first, which preserves input order.
+        max_pending = 2 * workers
+        pending = deque()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(model_path, precision)
+        ) as executor:
+            for chunk in read_loan_csv(input_path, chunksize=chunksize):
+                pending.append(executor.submit(_score_chunk, chunk, explain))
+                if monitor_drift:
+                    update_drift(chunk)
+                if len(pending) >= max_pending:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+
+    if monitor_drift:
+        flush_drift()
+    if header:
+        pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(output_path, index=False)
+
+    summary = {"rows": rows, "seconds": time.perf_counter() - start}
+    if precision == "float32":
+        summary["float32"] = float32
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV of loan applications.")
+    parser.add_argument("input", help="CSV with the same columns as data/loan_data.csv")
+    parser.add_argument("output", help="where to write the scored CSV")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--explain", type=int, default=0, metavar="K",
+                        help="add the top K positive and negative drivers per row")
+    parser.add_argument("--no-drift", action="store_true",
+                        help="do not count these rows in the drift monitor")
+    parser.add_argument("--precision", choices=["float64", "float32"], default="float64",
+                        help="float32 halves the scoring buffers; chunks that deviate from "
+                             "float64 by more than LOAN_FLOAT32_TOLERANCE are rescored")
+    args = parser.parse_args()
+
+    summary = score_csv(args.input, args.output, args.model, args.chunksize, args.workers,
+                        args.explain, not args.no_drift, args.precision)
+    print(f"Scored {summary['rows']} rows in {summary['seconds']:.2f}s")
+    float32 = summary.get("float32")
+    if float32 is not None:
+        if not float32["chunks"]:
+            print("float32: not available for this model, scored in float64")
+        else:
+            print(f"float32: max deviation {float32['max_deviation']:.2e} percentage points "
+                  f"(tolerance {FLOAT32_TOLERANCE:g}), "
+                  f"{float32['float64_chunks']}/{float32['chunks']} chunks rescored in float64")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# benchmark.py
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from src.data_loading import DATA_PATH, load_loan_data
+from src.resources import MODEL_PATH, load_pipeline
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+RESULTS_PATH = os.path.join("benchmarks", "results.json")
+BATCH_SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+PAGES = ["Home", "Loan Prediction", "Dashboard", "Insights"]
+DEFAULT_TOLERANCE = 0.20
+
+FORM_INPUT = {
+    "education": "Graduate",
+    "self_employed": "No",
+    "no_of_dependents": 0,
+    "income_annum": 30000,
+    "loan_amount": 500000,
+    "loan_term": 12,
+    "cibil_score": 700,
+    "residential_assets_value": 0,
+    "commercial_assets_value": 0,
+    "luxury_assets_value": 0,
+    "bank_asset_value": 0,
+}
+
+
+def measure(fn, repeats, warmup=1):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "repeats": repeats,
+    }
+
+
+def bench_single_row(repeats):
+    # Same path as the form: one-row DataFrame, reindex, predict_proba.
+    pipeline = load_pipeline()
+
+    def run():
+        input_df = pd.DataFrame([FORM_INPUT]).reindex(
+            columns=pipeline.feature_names_in_, fill_value=0)
+        pipeline.predict_proba(input_df)
+
+    return measure(run, repeats)
+
+
+def bench_batch(workdir, sizes, repeats):
+    from src.batch_scoring import score_csv
+
+    source = load_loan_data(DATA_PATH)
+    results = {}
+    for label, n_rows in sizes.items():
+        input_path = os.path.join(workdir, f"batch_{label}.csv")
+        output_path = os.path.join(workdir, f"scored_{label}.csv")
+        source.sample(n_rows, replace=True, random_state=0).to_csv(input_path, index=False)
+
+        # Resampled training rows are not live traffic for the drift window.
+        result = measure(lambda: score_csv(input_path, output_path, MODEL_PATH,
+                                           monitor_drift=False),
+                         repeats, warmup=0)
+        result["rows"] = n_rows
+        result["rows_per_second"] = n_rows / result["seconds"]
+        results[f"batch_scoring_{label}"] = result
+    return results
+
+
+def bench_precision(repeats, n_rows=1_000_000):
+    # The scoring kernel alone over an in-memory million-row frame, in
+    # float64 and through the reused float32 buffers.
+    from src.batch_scoring import float32_scorer
+    from src.resources import load_model
+
+    model = load_model()
+    scorer = float32_scorer(model)
+    if scorer is None:
+        return {}
+    frame = load_loan_data(DATA_PATH).sample(n_rows, replace=True, random_state=0)
+    expected = model.predict_proba(frame)[:, 1]
+    deviation = float(np.max(np.abs(scorer.positive_probability(frame) - expected))) * 100
+
+    results = {
+        "score_1m_float64": measure(lambda: model.predict_proba(frame), repeats),
+        "score_1m_float32": measure(lambda: scorer.positive_probability(frame), repeats),
+    }
+    results["score_1m_float32"]["max_deviation_points"] = deviation
+    return results
+
+
+def bench_training(repeats):
+    from src.model_training import build_pipeline, load_split
+
+    X_train, _, y_train, _ = load_split(DATA_PATH)
+    return measure(lambda: build_pipeline().fit(X_train, y_train), repeats)
+
+
+def bench_pdf(repeats):
+    from src.reports import generate_pdf
+
+    input_df = pd.DataFrame([FORM_INPUT])
+    return measure(lambda: generate_pdf(input_df, True, "Low"), repeats)
+
+
+def bench_concurrent_scoring(repeats, sessions=8, requests=200):
+    # Form scoring from several sessions at once through the shared
+    # worker pool; with LOAN_WORKERS >= 2 throughput scales with cores.
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src import worker_pool
+
+    worker_pool.start()
+    features = [dict(FORM_INPUT, cibil_score=300 + i % 600) for i in range(requests)]
+
+    def run():
+        with ThreadPoolExecutor(sessions) as executor:
+            list(executor.map(worker_pool.score, features))
+
+    result = measure(run, repeats)
+    result["requests_per_second"] = requests / result["seconds"]
+    result["workers"] = worker_pool.pool_stats()["workers"]
+    return result
+
+
+def _render_page(page):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file("app.py", default_timeout=300)
+    at.session_state["page"] = page
+    at.run()
+    if page == "Loan Prediction":
+        submit = [b for b in at.button if b.label == "Predict Loan Approval"][0]
+        submit.click().run()
+    if at.exception:
+        raise RuntimeError(f"{page} page raised: {at.exception[0].value}")
+
+
+@contextmanager
+def _unrecorded():
+    # Benchmark submits must not show up as real decisions in the
+    # prediction log (which refresh trains on) or in the drift window.
+    # Both modules read their directory at call time; the environment
+    # covers a first import inside the block.
+    from src import drift_monitor, prediction_log
+
+    names = ("LOAN_PREDICTION_LOG_DIR", "LOAN_DRIFT_DIR")
+    environ = {name: os.environ.get(name) for name in names}
+    dirs = prediction_log.LOG_DIR, drift_monitor.DRIFT_DIR
+    os.environ.update({name: "" for name in names})
+    prediction_log.LOG_DIR = drift_monitor.DRIFT_DIR = ""
+    try:
+        yield
+    finally:
+        prediction_log.LOG_DIR, drift_monitor.DRIFT_DIR = dirs
+        for name, value in environ.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def bench_pages(repeats):
+    # Headless renders through Streamlit's AppTest, one script run per
+    # repeat (the Loan Prediction page also submits the form).
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    key = {page: "page_" + page.lower().replace(" ", "_") for page in PAGES}
+    with _unrecorded():
+        return {key[page]: measure(lambda: _render_page(page), repeats) for page in PAGES}
+
+
+def bench_startup(repeats):
+    # Cold start of one app script run in a fresh interpreter.
+    from src.startup_profile import profile
+
+    report = profile(repeats=repeats)
+    return {
+        "seconds": report["seconds"],
+        "min_seconds": min(report["runs"]),
+        "repeats": repeats,
+        "heavy_modules_loaded": report["heavy_modules_loaded"],
+    }
+
+
+def run_all(repeats=5, sizes=BATCH_SIZES, pages=True):
+    results = {}
+    results["app_cold_start"] = bench_startup(max(1, repeats // 2))
+    results["predict_proba_single_row"] = bench_single_row(max(repeats, 200))
+    with tempfile.TemporaryDirectory() as workdir:
+        results.update(bench_batch(workdir, sizes, max(1, repeats // 2)))
+    results.update(bench_precision(repeats))
+    results["training_fit"] = bench_training(repeats)
+    results["generate_pdf"] = bench_pdf(max(repeats, 20))
+    results["concurrent_scoring"] = bench_concurrent_scoring(max(1, repeats // 2))
+    if pages:
+        results.update(bench_pages(repeats))
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    # A benchmark regresses when its median time grows by more than the
+    # tolerance relative to the baseline run.
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        ratio = result["seconds"] / reference["seconds"]
+        result["baseline_ratio"] = ratio
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the performance benchmark suite.")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the baseline for later comparisons")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--quick", action="store_true",
+                        help="skip the 1M-row batch and the page renders")
+    args = parser.parse_args()
+
+    sizes = {k: v for k, v in BATCH_SIZES.items() if not (args.quick and v > 100_000)}
+    results = run_all(args.repeats, sizes, pages=not args.quick)
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+    report = {"environment": environment(), "results": results, "regressions": regressions}
+    write_json(args.output, report)
+    if args.save_baseline:
+        write_json(args.baseline, report)
+
+    for name, result in results.items():
+        ratio = result.get("baseline_ratio")
+        note = f"  ({ratio:.2f}x baseline)" if ratio is not None else ""
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<28} {result['seconds'] * 1000:10.2f} ms{note}{flag}")
+    print(f"Results written to {args.output}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# charts.py
+
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+
+# Rendered figures are cached as PNG bytes, keyed by the dataset version
+# and every parameter that changes the picture, so a revisit to a page is
+# a dictionary lookup instead of a seaborn redraw.
+CHART_CACHE_SIZE = int(os.environ.get("LOAN_CHART_CACHE_SIZE", "32"))
+# Above this many rows the income/loan scatter is drawn as a 2-D density
+# grid, whose cost does not grow with the number of rows.
+SCATTER_MAX_ROWS = int(os.environ.get("LOAN_SCATTER_MAX_ROWS", "50000"))
+DENSITY_BINS = 60
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def cached_png(key, render):
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return _cache[key]
+        _stats["misses"] += 1
+
+    png = render()
+
+    with _lock:
+        _cache[key] = png
+        _cache.move_to_end(key)
+        while len(_cache) > CHART_CACHE_SIZE:
+            _cache.popitem(last=False)
+            _stats["evictions"] += 1
+    return png
+
+
+def chart_cache_stats():
+    with _lock:
+        return dict(_stats, entries=len(_cache))
+
+
+def _new_figure(figsize, dpi):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt.subplots(figsize=figsize, dpi=dpi)
+
+
+def _to_png(fig):
+    # Same options st.pyplot uses, so cached images look identical.
+    import matplotlib.pyplot as plt
+    fig.tight_layout()
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def status_counts_png(version, snapshot, figsize=(5, 3.5), dpi=120):
+    def render():
+        import seaborn as sns
+        fig, ax = _new_figure(figsize, dpi)
+        counts = snapshot["loan_status_counts"]
+        sns.barplot(x=list(counts), y=list(counts.values()), ax=ax)
+        ax.set(xlabel="loan_status", ylabel="count")
+        return _to_png(fig)
+
+    return cached_png((version, "status_counts", figsize, dpi), render)
+
+
+def income_histogram_png(version, snapshot, figsize=(5, 3.5), dpi=100):
+    def render():
+        import seaborn as sns
+        fig, ax = _new_figure(figsize, dpi)
+        income = snapshot["histograms"]["income_annum"]
+        sns.histplot(x=income["edges"][:-1], weights=income["counts"], bins=income["edges"], ax=ax)
+        ax.set_xlabel("income_annum")
+        return _to_png(fig)
+
+    return cached_png((version, "income_histogram", figsize, dpi), render)
+
+
+def filtered_histogram_png(version, filters, histogram, figsize=(5, 3.5), dpi=100):
+    # histogram comes from DashboardIndex.query(); bars are split into
+    # approved and rejected applications.
+    def render():
+        import seaborn as sns
+        fig, ax = _new_figure(figsize, dpi)
+        edges = np.asarray(histogram["edges"], dtype=np.float64)
+        approved = np.asarray(histogram["approved"])
+        rejected = np.asarray(histogram["counts"]) - approved
+        # One weighted point per bin and outcome, at the bin's left edge
+        sns.histplot(x=np.concatenate([edges[:-1], edges[:-1]]),
+                     weights=np.concatenate([approved, rejected]),
+                     # a list: seaborn compares bins with "auto"
+                     bins=edges.tolist(),
+                     hue=["Approved"] * len(approved) + ["Rejected"] * len(rejected),
+                     multiple="stack", ax=ax)
+        ax.set_xlabel(histogram["column"])
+        return _to_png(fig)
+
+    return cached_png((version, "filtered_histogram", filters, figsize, dpi), render)
+
+
+def what_if_png(key, result, boundary, figsize=(6, 3.5), dpi=100):
+    # key identifies the model, applicant and grid the result came from.
+    def render():
+        fig, ax = _new_figure(figsize, dpi)
+        names = result["features"]
+        x = np.asarray(result["axes"][0])
+        if len(names) == 1:
+            ax.plot(x, result["probability"], color="#2563eb")
+            for crossing in boundary:
+                ax.axvline(crossing["value"], color="#dc2626", linestyle="--")
+            ax.set(xlabel=names[0], ylabel="approval probability (%)", ylim=(0, 100))
+        else:
+            y = np.asarray(result["axes"][1])
+            mesh = ax.pcolormesh(x, y, result["probability"].T, shading="nearest",
+                                 cmap="RdYlGn", vmin=0, vmax=100)
+            fig.colorbar(mesh, ax=ax, label="approval probability (%)")
+            if result["approved"].any() and not result["approved"].all():
+                ax.contour(x, y, result["approved"].T.astype(float), levels=[0.5],
+                           colors="black", linestyles="--")
+            ax.set(xlabel=names[0], ylabel=names[1])
+        return _to_png(fig)
+
+    return cached_png(("what_if", key, figsize, dpi), render)
+
+
+def education_counts_png(version, snapshot, figsize=(5, 3.5), dpi=120):
+    def render():
+        import pandas as pd
+        import seaborn as sns
+        fig, ax = _new_figure(figsize, dpi)
+        counts = pd.DataFrame([
+            {"education": edu, "loan_status": status, "count": n}
+            for edu, by_status in snapshot["education_status_counts"].items()
+            for status, n in by_status.items()
+        ])
+        sns.barplot(x="education", y="count", hue="loan_status", data=counts, ax=ax)
+        return _to_png(fig)
+
+    return cached_png((version, "education_counts", figsize, dpi), render)
+
+
+def income_vs_loan_png(version, frame, figsize=(5, 3.5), dpi=120,
+                       max_rows=SCATTER_MAX_ROWS, bins=DENSITY_BINS):
+    density = len(frame) > max_rows
+
+    def render():
+        fig, ax = _new_figure(figsize, dpi)
+        if density:
+            _draw_density(fig, ax, frame["income_annum"].to_numpy(),
+                          frame["loan_amount"].to_numpy(), bins)
+        else:
+            import seaborn as sns
+            sns.scatterplot(x="income_annum", y="loan_amount", hue="loan_status",
+                            data=frame, ax=ax)
+        return _to_png(fig)
+
+    mode = ("density", bins) if density else ("scatter",)
+    return cached_png((version, "income_vs_loan", figsize, dpi, mode), render)
+
+
+def _draw_density(fig, ax, x, y, bins):
+    from matplotlib.colors import LogNorm
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    counts = np.ma.masked_equal(counts.T, 0)
+    mesh = ax.pcolormesh(x_edges, y_edges, counts, norm=LogNorm(), cmap="viridis")
+    fig.colorbar(mesh, ax=ax, label="applications")
+    ax.set(xlabel="income_annum", ylabel="loan_amount")
@@ -0,0 +1,202 @@
+# dashboard_index.py
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.dashboard_snapshot import histogram_edges
+from src.data_loading import CACHE_DIR, DATA_PATH, TARGET_COL
+from src.resources import dataset_version, load_dataset, load_file
+
+INDEX_VERSION = 1
+RANGE_COLS = ["cibil_score", "loan_amount"]
+CATEGORY_COLS = ["education", "self_employed"]
+HISTOGRAM_COL = "income_annum"
+RANGE_CACHE_SIZE = 16
+
+# Set bits per byte value, for counting rows in a packed bitmap.
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _pack(positions, n_positions):
+    bits = np.zeros(n_positions, dtype=bool)
+    bits[positions] = True
+    return np.packbits(bits)
+
+
+def build_index(frame):
+    # Rows are laid out grouped by HISTOGRAM_COL bin, and every bin's
+    # segment is padded to a whole byte. A filtered histogram is then the
+    # popcount of each segment of the filter bitmap, with no per-row work.
+    # Padding bits are never set, so they drop out of every count.
+    values = frame[HISTOGRAM_COL].to_numpy(dtype=np.float64)
+    edges = histogram_edges(values)
+    n_bins = len(edges) - 1
+    bins = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, n_bins - 1)
+
+    counts = np.bincount(bins, minlength=n_bins)
+    padded = (counts + 7) // 8 * 8
+    segment_starts = np.concatenate([[0], np.cumsum(padded)])
+    first_sorted = np.cumsum(counts) - counts
+    order = np.argsort(bins, kind="stable")
+    positions = np.empty(len(frame), dtype=np.int64)
+    positions[order] = segment_starts[bins[order]] + np.arange(len(frame)) - first_sorted[bins[order]]
+    n_positions = int(segment_starts[-1])
+
+    arrays = {
+        "meta": np.array([INDEX_VERSION, len(frame), n_positions], dtype=np.int64),
+        "edges": edges,
+        "segment_bytes": segment_starts // 8,
+        "valid": _pack(positions, n_positions),
+    }
+    status = frame[TARGET_COL].astype("category")
+    arrays["approved"] = _pack(positions[_codes_equal(status, "Approved")], n_positions)
+    for col in RANGE_COLS:
+        column = frame[col].to_numpy()
+        by_value = np.argsort(column, kind="stable")
+        arrays[f"sorted__{col}"] = column[by_value]
+        arrays[f"positions__{col}"] = positions[by_value]
+    for col in CATEGORY_COLS:
+        column = frame[col].astype("category")
+        for value in column.cat.categories:
+            rows = _codes_equal(column, value)
+            if rows.any():
+                arrays[f"category__{col}__{value}"] = _pack(positions[rows], n_positions)
+    return arrays
+
+
+def _codes_equal(column, value):
+    # Compares integer category codes rather than millions of strings.
+    categories = column.cat.categories
+    if value not in categories:
+        return np.zeros(len(column), dtype=bool)
+    return column.cat.codes.to_numpy() == categories.get_loc(value)
+
+
+class DashboardIndex:
+    # Read-only once built; one instance is shared by every session.
+
+    def __init__(self, arrays):
+        version, self.n_rows, self.n_positions = (int(v) for v in arrays["meta"])
+        if version != INDEX_VERSION:
+            raise ValueError("dashboard index was written by an older format")
+        self.edges = arrays["edges"]
+        self.segment_bytes = arrays["segment_bytes"]
+        self.valid = arrays["valid"]
+        self.approved = arrays["approved"]
+        self.sorted_values = {col: arrays[f"sorted__{col}"] for col in RANGE_COLS}
+        self.sorted_positions = {col: arrays[f"positions__{col}"] for col in RANGE_COLS}
+        self.categories = {col: {} for col in CATEGORY_COLS}
+        for key in arrays:
+            if key.startswith("category__"):
+                _, col, value = key.split("__", 2)
+                self.categories[col][value] = arrays[key]
+        self._lock = threading.Lock()
+        self._ranges = OrderedDict()
+
+    def bounds(self, col):
+        values = self.sorted_values[col]
+        if len(values) == 0:
+            return 0, 0
+        return values[0].item(), values[-1].item()
+
+    def category_values(self, col):
+        return sorted(self.categories[col])
+
+    def _range_bitmap(self, col, low, high):
+        # Two binary searches find the matching rows; whichever side of
+        # the range is smaller gets scattered into the bitmap. Recent
+        # ranges are kept, since a widget change alters one filter at a time.
+        key = (col, low, high)
+        with self._lock:
+            if key in self._ranges:
+                self._ranges.move_to_end(key)
+                return self._ranges[key]
+
+        values = self.sorted_values[col]
+        positions = self.sorted_positions[col]
+        start = np.searchsorted(values, low, side="left")
+        stop = np.searchsorted(values, high, side="right")
+        if stop - start <= len(values) // 2:
+            bitmap = _pack(positions[start:stop], self.n_positions)
+        else:
+            bits = np.unpackbits(self.valid, count=self.n_positions).view(bool)
+            bits[positions[:start]] = False
+            bits[positions[stop:]] = False
+            bitmap = np.packbits(bits)
+
+        with self._lock:
+            self._ranges[key] = bitmap
+            while len(self._ranges) > RANGE_CACHE_SIZE:
+                self._ranges.popitem(last=False)
+        return bitmap
+
+    def mask(self, ranges=None, categories=None):
+        # ranges: {column: (low, high)}, both ends inclusive.
+        # categories: {column: [allowed values]}; empty means no filter.
+        mask = self.valid
+        for col, (low, high) in (ranges or {}).items():
+            col_low, col_high = self.bounds(col)
+            if low <= col_low and high >= col_high:
+                continue
+            mask = mask & self._range_bitmap(col, low, high)
+        for col, allowed in (categories or {}).items():
+            if not allowed:
+                continue
+            bitmaps = [self.categories[col][v] for v in allowed if v in self.categories[col]]
+            either = np.bitwise_or.reduce(bitmaps) if bitmaps else np.zeros_like(self.valid)
+            mask = mask & either
+        return mask
+
+    def _segment_counts(self, bitmap):
+        per_byte = np.concatenate([[0], np.cumsum(POPCOUNT[bitmap], dtype=np.int64)])
+        return per_byte[self.segment_bytes[1:]] - per_byte[self.segment_bytes[:-1]]
+
+    def query(self, ranges=None, categories=None):
+        mask = self.mask(ranges, categories)
+        counts = self._segment_counts(mask)
+        approved_counts = self._segment_counts(mask & self.approved)
+        total = int(counts.sum())
+        approved = int(approved_counts.sum())
+        return {
+            "total": total,
+            "approved": approved,
+            "rejected": total - approved,
+            "approval_rate": round((approved / total) * 100, 2) if total else 0.0,
+            "rejection_rate": round(((total - approved) / total) * 100, 2) if total else 0.0,
+            "histogram": {
+                "column": HISTOGRAM_COL,
+                "edges": self.edges.tolist(),
+                "counts": counts.tolist(),
+                "approved": approved_counts.tolist(),
+            },
+        }
+
+
+def index_path(version):
+    return os.path.join(CACHE_DIR, f"dashboard-index-{version[:16]}.npz")
+
+
+def _read_index(path):
+    with np.load(path, allow_pickle=False) as arrays:
+        return DashboardIndex({key: arrays[key] for key in arrays.files})
+
+
+def load_index(path=DATA_PATH):
+    # Built once per dataset version, like the dashboard snapshot, and
+    # then served from the process-wide resource cache.
+    target = index_path(dataset_version(path))
+    if os.path.exists(target):
+        try:
+            return load_file("dashboard_index", target, _read_index)
+        except ValueError:
+            pass
+
+    arrays = build_index(load_dataset(path))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = target[:-len(".npz")] + ".tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, target)
+    return load_file("dashboard_index", target, _read_index)
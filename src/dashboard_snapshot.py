@@ -0,0 +1,92 @@
+# dashboard_snapshot.py
+
+import json
+import os
+
+import numpy as np
+
+from src.data_loading import CACHE_DIR, DATA_PATH, TARGET_COL
+from src.data_preprocessing import NUMERICAL_COLS
+from src.resources import dataset_version, load_dataset, load_file
+
+SNAPSHOT_VERSION = 1
+# seaborn's histplot picks bins with numpy's "auto" rule; the cap keeps
+# the snapshot small on very large files.
+MAX_HISTOGRAM_BINS = 200
+
+
+def histogram_edges(values):
+    edges = np.histogram_bin_edges(values, bins="auto")
+    if len(edges) - 1 > MAX_HISTOGRAM_BINS:
+        edges = np.histogram_bin_edges(values, bins=MAX_HISTOGRAM_BINS)
+    return edges
+
+
+def _histogram(values):
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {"edges": [], "counts": []}
+    counts, edges = np.histogram(values, bins=histogram_edges(values))
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def build_snapshot(frame):
+    # Everything the Dashboard and Insights pages show except the
+    # per-row scatter, computed in a single pass per column.
+    total = len(frame)
+    status_counts = frame[TARGET_COL].value_counts(sort=False)
+    approved = int(status_counts.get("Approved", 0))
+    rejected = int(status_counts.get("Rejected", 0))
+
+    education_counts = (
+        frame.groupby(["education", TARGET_COL], observed=True).size().unstack(fill_value=0)
+    )
+
+    return {
+        "snapshot_version": SNAPSHOT_VERSION,
+        "total": total,
+        "approved": approved,
+        "rejected": rejected,
+        "approval_rate": round((approved / total) * 100, 2) if total else 0.0,
+        "rejection_rate": round((rejected / total) * 100, 2) if total else 0.0,
+        "loan_status_counts": {str(k): int(v) for k, v in status_counts.items()},
+        "education_status_counts": {
+            str(edu): {str(status): int(n) for status, n in row.items()}
+            for edu, row in education_counts.iterrows()
+        },
+        "histograms": {
+            col: _histogram(frame[col].to_numpy(dtype=np.float64))
+            for col in NUMERICAL_COLS if col in frame.columns
+        },
+    }
+
+
+def snapshot_path(version):
+    return os.path.join(CACHE_DIR, f"snapshot-{version[:16]}.json")
+
+
+def _read_json(path):
+    with open(path) as f:
+        snapshot = json.load(f)
+    if snapshot.get("snapshot_version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path} was written by an older snapshot format")
+    return snapshot
+
+
+def load_snapshot(path=DATA_PATH):
+    # Built once per dataset version (the source file's hash) and then
+    # served from the process-wide resource cache.
+    target = snapshot_path(dataset_version(path))
+    if os.path.exists(target):
+        try:
+            return load_file("snapshot", target, _read_json)
+        except ValueError:
+            pass
+
+    snapshot = build_snapshot(load_dataset(path))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = target + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, target)
+    return load_file("snapshot", target, _read_json)
@@ -0,0 +1,115 @@
+# data_loading.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing import CATEGORICAL_COLS, NUMERICAL_COLS
+
+try:
+    import pyarrow  # noqa: F401  (needed by DataFrame.to_parquet / read_parquet)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+DATA_PATH = os.path.join("data", "loan_data.csv")
+CACHE_DIR = os.path.join("data", ".cache")
+
+TARGET_COL = "loan_status"
+
+# loan_data.csv writes "loan_id, no_of_dependents, ..." and " Graduate",
+# " Approved": skipinitialspace drops the leading space from headers and
+# values while the file is parsed, so nothing downstream has to strip.
+# Numeric columns are parsed as float64, so that a blank cell is read as
+# NaN (the pipeline imputes it) and a decimal is kept, then narrowed to
+# int32 wherever every value is a whole number.
+INTEGER_COLS = ["loan_id", *NUMERICAL_COLS]
+INT32_RANGE = (np.iinfo(np.int32).min, np.iinfo(np.int32).max)
+COLUMN_DTYPES = {
+    **{col: "float64" for col in INTEGER_COLS},
+    **{col: "category" for col in CATEGORICAL_COLS},
+    TARGET_COL: "category",
+}
+
+
+def _tidy_categories(series, transform=None):
+    # Cleans the (few) category labels instead of every row.
+    cats = series.cat.categories.str.strip()
+    if transform is not None:
+        cats = transform(cats.str)
+    if cats.is_unique:
+        return series.cat.rename_categories(cats)
+    values = series.astype(str).str.strip()
+    return (transform(values.str) if transform is not None else values).astype("category")
+
+
+def _tidy_column(series, transform=None):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return _tidy_categories(series, transform)
+    if series.dtype != object:
+        return series
+    # Non-string values (e.g. numeric codes) are left as they are.
+    values = series.str.strip().fillna(series)
+    return transform(values.str).fillna(values) if transform is not None else values
+
+
+def normalize_frame(frame):
+    # Same cleanup for frames that did not come from read_loan_csv, e.g.
+    # JSON payloads or CSVs written with a different tool.
+    frame = frame.copy(deep=False)
+    frame.columns = frame.columns.str.strip()
+    return _finish(frame)
+
+
+def read_loan_csv(path, **kwargs):
+    frame = pd.read_csv(path, skipinitialspace=True, dtype=COLUMN_DTYPES, **kwargs)
+    if kwargs.get("chunksize"):
+        return (_finish(chunk) for chunk in frame)
+    return _finish(frame)
+
+
+def _narrow(series):
+    values = series.to_numpy()
+    if (np.isnan(values).any() or not np.array_equal(values, np.trunc(values))
+            or values.min(initial=0) < INT32_RANGE[0] or values.max(initial=0) > INT32_RANGE[1]):
+        return series
+    return series.astype("int32")
+
+
+def _finish(frame):
+    for col in INTEGER_COLS:
+        if col in frame.columns and frame[col].dtype == np.float64:
+            frame[col] = _narrow(frame[col])
+    for col in CATEGORICAL_COLS:
+        if col in frame.columns:
+            frame[col] = _tidy_column(frame[col])
+    if TARGET_COL in frame.columns:
+        frame[TARGET_COL] = _tidy_column(frame[TARGET_COL], lambda c: c.capitalize())
+    return frame
+
+
+def cache_path(path, digest):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{digest[:16]}.parquet")
+
+
+def load_loan_data(path=DATA_PATH, use_cache=True):
+    # Parquet keeps the compact dtypes and is read without any CSV
+    # parsing; the cache file name carries the source file's hash, so an
+    # edited CSV can never be served from a stale cache.
+    if not (use_cache and HAS_PARQUET):
+        return read_loan_csv(path)
+
+    from src.resources import file_hash
+
+    cached = cache_path(path, file_hash(path))
+    if os.path.exists(cached):
+        return pd.read_parquet(cached)
+
+    frame = read_loan_csv(path)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = cached + ".tmp"
+    frame.to_parquet(tmp, index=False)
+    os.replace(tmp, cached)
+    return frame
@@ -1,29 +1,36 @@
 # data_preprocessing.py
 
-import pandas as pd
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.impute import SimpleImputer
-from sklearn.pipeline import Pipeline
-
-def get_preprocessor():
-    categorical_cols = ["education", "self_employed"]
-
-    numerical_cols = [
-        "no_of_dependents",
-        "income_annum",
-        "loan_amount",
-        "loan_term",
-        "cibil_score",
-        "residential_assets_value",
-        "commercial_assets_value",
-        "luxury_assets_value",
-        "bank_asset_value"
-    ]
+CATEGORICAL_COLS = ["education", "self_employed"]
+
+NUMERICAL_COLS = [
+    "no_of_dependents",
+    "income_annum",
+    "loan_amount",
+    "loan_term",
+    "cibil_score",
+    "residential_assets_value",
+    "commercial_assets_value",
+    "luxury_assets_value",
+    "bank_asset_value"
+]
+
+FEATURE_COLS = NUMERICAL_COLS + CATEGORICAL_COLS
+
+
+def get_preprocessor(categories="auto"):
+    # sklearn is imported here so that importing the column lists (as the
+    # app, the loaders and the fast scorer do) stays cheap.
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    categorical_cols = CATEGORICAL_COLS
+    numerical_cols = NUMERICAL_COLS
 
     categorical_pipeline = Pipeline([
         ("imputer", SimpleImputer(strategy="most_frequent")),
-        ("encoder", OneHotEncoder(handle_unknown="ignore"))
+        ("encoder", OneHotEncoder(categories=categories, handle_unknown="ignore"))
     ])
 
     numerical_pipeline = Pipeline([
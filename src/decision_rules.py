@@ -0,0 +1,45 @@
+# decision_rules.py
+
+import numpy as np
+
+# Thresholds of the "Loan Prediction" form. Probabilities are percentages
+# (0-100), the threshold included: approval needs at least 70%.
+APPROVAL_THRESHOLD = 70
+LOW_RISK_THRESHOLD = 80
+MEDIUM_RISK_THRESHOLD = 60
+EDGE_CASE_MAX_PROBABILITY = 35
+
+
+def approved_class_index(model):
+    classes = list(model.classes_)
+    return classes.index("Approved") if "Approved" in classes else 1
+
+
+def apply_decision_rules(approved_prob, income_annum, no_of_dependents, loan_amount):
+    # Vectorized over arrays so the form (one row) and batch scoring
+    # (many rows) make exactly the same decisions.
+    approved_prob = np.asarray(approved_prob, dtype=float)
+    income_annum = np.asarray(income_annum)
+    no_of_dependents = np.asarray(no_of_dependents)
+    loan_amount = np.asarray(loan_amount)
+
+    approved = approved_prob >= APPROVAL_THRESHOLD
+    risk = np.where(
+        approved_prob >= LOW_RISK_THRESHOLD,
+        "Low",
+        np.where(approved_prob >= MEDIUM_RISK_THRESHOLD, "Medium", "High"),
+    ).astype(object)
+
+    # Extreme edge cases handling
+    edge_case = (
+        (income_annum < 50000)
+        & (no_of_dependents >= 5)
+        & (loan_amount > 10 * income_annum)
+    )
+    approved = approved & ~edge_case
+    approved_prob = np.where(
+        edge_case, np.minimum(approved_prob, EDGE_CASE_MAX_PROBABILITY), approved_prob
+    )
+    risk[edge_case] = "High"
+
+    return approved_prob, approved, risk
@@ -0,0 +1,312 @@
+# drift_monitor.py
+
+import argparse
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.data_loading import CACHE_DIR, DATA_PATH
+from src.data_preprocessing import CATEGORICAL_COLS, NUMERICAL_COLS
+from src.resources import dataset_version, load_dataset, load_file
+
+# Live sketches are kept per process and merged when a report is asked
+# for. Empty LOAN_DRIFT_DIR turns monitoring off.
+DRIFT_DIR = os.environ.get("LOAN_DRIFT_DIR", os.path.join("data", "drift"))
+FLUSH_SECONDS = float(os.environ.get("LOAN_DRIFT_FLUSH_SECONDS", "30"))
+
+REFERENCE_VERSION = 2
+N_BINS = 20
+MAX_CATEGORIES = 50
+OTHER = "__other__"
+# Proportions are floored at this before taking logs in the PSI.
+EPSILON = 1e-4
+MIN_ROWS = 100
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_live = None
+_last_flush = time.monotonic()
+_sketch_file = f"live-{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+
+
+def _numeric_edges(values):
+    # Inner edges at the training quantiles, so every reference bin holds
+    # about the same share of rows; the outer bins are open-ended.
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return []
+    return np.unique(np.quantile(values, np.linspace(0, 1, N_BINS + 1)[1:-1])).tolist()
+
+
+def empty_sketch(reference):
+    # Tagged with the reference's training-data version: counts are only
+    # comparable within one set of bin edges.
+    return {
+        "reference": reference.get("dataset_version"),
+        "rows": 0,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "columns": {
+            col: ({"counts": [0] * (len(spec["edges"]) + 1), "missing": 0}
+                  if "edges" in spec else {"counts": {}, "missing": 0})
+            for col, spec in reference["columns"].items()
+        },
+    }
+
+
+def add_to_sketch(sketch, reference, frame):
+    # One bincount per numeric column and one value_counts per
+    # categorical column; the sketch size does not depend on len(frame).
+    sketch["rows"] += len(frame)
+    for col, spec in reference["columns"].items():
+        if col not in frame.columns:
+            continue
+        target = sketch["columns"][col]
+        if "edges" in spec:
+            values = pd.to_numeric(frame[col], errors="coerce").to_numpy(dtype=np.float64)
+            missing = np.isnan(values)
+            bins = np.searchsorted(spec["edges"], values[~missing], side="right")
+            target["counts"] = (np.asarray(target["counts"], dtype=np.int64)
+                                + np.bincount(bins, minlength=len(spec["edges"]) + 1)).tolist()
+            target["missing"] += int(missing.sum())
+        else:
+            # Keyed as text, so values read as numbers match the labels.
+            target["missing"] += int(frame[col].isna().sum())
+            counts = target["counts"]
+            for value, n in frame[col].value_counts().items():
+                value = str(value)
+                if value not in counts and len(counts) >= MAX_CATEGORIES:
+                    value = OTHER
+                counts[value] = counts.get(value, 0) + int(n)
+    return sketch
+
+
+def build_reference(frame, version=None):
+    reference = {
+        "reference_version": REFERENCE_VERSION,
+        "dataset_version": version,
+        "columns": {col: {"edges": _numeric_edges(frame[col].to_numpy(dtype=np.float64))}
+                    for col in NUMERICAL_COLS if col in frame.columns},
+    }
+    reference["columns"].update({col: {} for col in CATEGORICAL_COLS if col in frame.columns})
+    reference["sketch"] = add_to_sketch(empty_sketch(reference), reference, frame)
+    return reference
+
+
+def reference_path(version):
+    return os.path.join(CACHE_DIR, f"drift-reference-{version[:16]}.json")
+
+
+def _read_json(path):
+    with open(path) as f:
+        reference = json.load(f)
+    if reference.get("reference_version") != REFERENCE_VERSION:
+        raise ValueError(f"{path} was written by an older reference format")
+    return reference
+
+
+def load_reference(path=DATA_PATH):
+    # Built once per training-data version, like the dashboard snapshot.
+    version = dataset_version(path)
+    target = reference_path(version)
+    if os.path.exists(target):
+        try:
+            return load_file("drift_reference", target, _read_json)
+        except ValueError:
+            pass
+
+    _write_json(target, json.dumps(build_reference(load_dataset(path), version)))
+    return load_file("drift_reference", target, _read_json)
+
+
+def _write_json(path, payload):
+    # Session threads (and other processes) can write the same file at
+    # once, so each write gets its own temp file.
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def update(applications):
+    # applications: a frame of scored applications, or one form's
+    # features as a dict. Counts go to this process's sketch, which is
+    # written to DRIFT_DIR every FLUSH_SECONDS and at exit.
+    global _live
+    if not DRIFT_DIR:
+        return
+    if isinstance(applications, dict):
+        applications = pd.DataFrame([applications])
+    reference = load_reference()
+    with _lock:
+        if _live is None or _live.get("reference") != reference.get("dataset_version"):
+            # The training data changed: a new window against the new bins.
+            _live = empty_sketch(reference)
+        add_to_sketch(_live, reference, applications)
+        due = time.monotonic() - _last_flush >= FLUSH_SECONDS
+    if due:
+        flush()
+
+
+def flush():
+    # Flushes are serialized, so a slower write of an older sketch can
+    # never replace a newer one.
+    global _last_flush
+    with _flush_lock:
+        with _lock:
+            _last_flush = time.monotonic()
+            if _live is None or not DRIFT_DIR:
+                return
+            payload = json.dumps(_live)
+        _write_json(os.path.join(DRIFT_DIR, _sketch_file), payload)
+
+
+atexit.register(flush)
+
+
+def _merge(sketches, reference):
+    # Sketches against another reference (e.g. flushed by a process still
+    # on the previous training data) are left out.
+    merged = empty_sketch(reference)
+    for sketch in sketches:
+        if sketch.get("reference") != merged["reference"]:
+            continue
+        merged["rows"] += sketch["rows"]
+        merged["started_at"] = min(merged["started_at"], sketch["started_at"])
+        for col, target in merged["columns"].items():
+            source = sketch["columns"].get(col)
+            if source is None:
+                continue
+            target["missing"] += source["missing"]
+            if isinstance(target["counts"], list):
+                if len(source["counts"]) != len(target["counts"]):
+                    raise ValueError(f"{col}: {len(source['counts'])} bins in a live sketch, "
+                                     f"{len(target['counts'])} in the reference")
+                target["counts"] = [a + b for a, b in zip(target["counts"], source["counts"])]
+            else:
+                for value, n in source["counts"].items():
+                    target["counts"][value] = target["counts"].get(value, 0) + n
+    return merged
+
+
+def live_sketch(reference=None):
+    # Every process's last flushed sketch plus this process's current one.
+    reference = reference or load_reference()
+    sketches = []
+    for path in glob.glob(os.path.join(DRIFT_DIR, "live-*.json")) if DRIFT_DIR else []:
+        if os.path.basename(path) == _sketch_file:
+            continue
+        try:
+            with open(path) as f:
+                sketches.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    with _lock:
+        if _live is not None:
+            sketches.append(json.loads(json.dumps(_live)))
+    return _merge(sketches, reference)
+
+
+def _proportions(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    return counts / total if total else counts
+
+
+def psi(expected, actual):
+    e = np.maximum(_proportions(expected), EPSILON)
+    a = np.maximum(_proportions(actual), EPSILON)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def binned_ks(expected, actual):
+    # KS statistic on the binned CDFs: a lower bound on the exact one.
+    return float(np.max(np.abs(np.cumsum(_proportions(expected)) - np.cumsum(_proportions(actual)))))
+
+
+def _status(score, rows):
+    if rows < MIN_ROWS:
+        return "insufficient data"
+    if score >= PSI_SIGNIFICANT:
+        return "significant"
+    if score >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+def drift_report(reference=None, live=None):
+    reference = reference or load_reference()
+    live = live or live_sketch(reference)
+    expected = reference["sketch"]["columns"]
+    rows = []
+    for col, current in live["columns"].items():
+        if isinstance(current["counts"], list):
+            e, a = expected[col]["counts"], current["counts"]
+            ks = binned_ks(e, a)
+        else:
+            values = sorted(set(expected[col]["counts"]) | set(current["counts"]))
+            e = [expected[col]["counts"].get(v, 0) for v in values]
+            a = [current["counts"].get(v, 0) for v in values]
+            ks = None
+        score = psi(e, a)
+        rows.append({
+            "feature": col,
+            "psi": score,
+            "ks": ks,
+            "status": _status(score, live["rows"]),
+            "missing": current["missing"],
+        })
+    return {
+        "reference_rows": reference["sketch"]["rows"],
+        "live_rows": live["rows"],
+        "since": live["started_at"],
+        "features": sorted(rows, key=lambda r: r["psi"], reverse=True),
+    }
+
+
+def reset():
+    # Starts a new monitoring window.
+    global _live
+    with _lock:
+        _live = None
+    if not DRIFT_DIR:
+        return
+    for path in glob.glob(os.path.join(DRIFT_DIR, "live-*.json")):
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature drift against the training data.")
+    parser.add_argument("command", choices=["report", "reset"], nargs="?", default="report")
+    args = parser.parse_args()
+
+    if args.command == "reset":
+        reset()
+        print("Drift window reset")
+        return
+    report = drift_report()
+    print(f"{report['live_rows']} applications since {report['since']} "
+          f"vs {report['reference_rows']} training rows")
+    print(f"{'feature':<26} {'PSI':>8} {'KS':>8}  status")
+    for row in report["features"]:
+        ks = f"{row['ks']:8.4f}" if row["ks"] is not None else f"{'-':>8}"
+        print(f"{row['feature']:<26} {row['psi']:8.4f} {ks}  {row['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# engines.py
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Every engine is a classifier behind the same get_preprocessor() front
+# end. Estimators are named rather than imported so that resources.py can
+# resolve model paths without loading sklearn.
+ENGINES = {
+    "logistic": {
+        "estimator": "sklearn.linear_model.LogisticRegression",
+        "params": {"max_iter": 2000, "class_weight": "balanced", "C": 0.5},
+    },
+    "gradient_boosting": {
+        "estimator": "sklearn.ensemble.HistGradientBoostingClassifier",
+        "params": {"max_iter": 200, "learning_rate": 0.1, "class_weight": "balanced",
+                   "random_state": 42},
+    },
+    "decision_tree": {
+        "estimator": "sklearn.tree.DecisionTreeClassifier",
+        "params": {"max_depth": 4, "class_weight": "balanced", "random_state": 42},
+    },
+}
+DEFAULT_ENGINE = "logistic"
+BASE_MODEL_PATH = os.path.join("models", "loan_model.pkl")
+COMPARISON_PATH = os.path.join("benchmarks", "engines.json")
+
+
+def check_engine(engine):
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {sorted(ENGINES)}")
+    return engine
+
+
+def engine_model_path(engine=DEFAULT_ENGINE):
+    # The default engine keeps models/loan_model.pkl; the others sit next
+    # to it as models/loan_model_<engine>.pkl.
+    check_engine(engine)
+    if engine == DEFAULT_ENGINE:
+        return BASE_MODEL_PATH
+    base, ext = os.path.splitext(BASE_MODEL_PATH)
+    return f"{base}_{engine}{ext}"
+
+
+def build_model(engine=DEFAULT_ENGINE, **params):
+    spec = ENGINES[check_engine(engine)]
+    module, name = spec["estimator"].rsplit(".", 1)
+    estimator = getattr(importlib.import_module(module), name)
+    return estimator(**{**spec["params"], **params})
+
+
+def is_linear(model):
+    # Linear engines fold into the NumPy kernel (src/fast_scorer.py) and
+    # its artifact; the others are served as pickled pipelines.
+    from src.fast_scorer import LinearScorer
+
+    if isinstance(model, LinearScorer):
+        return True
+    model = model.named_steps["model"] if hasattr(model, "named_steps") else model
+    return hasattr(model, "coef_")
+
+
+# Comparison: every engine trained on the same split, then timed the way
+# the app and batch scoring use it.
+
+BATCH_ROWS = 100_000
+SINGLE_ROW_REPEATS = 200
+
+_LOAD_SCRIPT = """
+import sys, time
+sys.path.insert(0, {cwd!r})
+start = time.perf_counter()
+from src.resources import load_model
+load_model({path!r})
+print(time.perf_counter() - start)
+"""
+
+
+def _median_seconds(fn, repeats):
+    fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _load_seconds(path, repeats):
+    # Fresh interpreter per load, through the app's own loader, so the
+    # imports the served form needs are included.
+    timings = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", _LOAD_SCRIPT.format(cwd=os.getcwd(), path=path)],
+            capture_output=True, text=True, check=True,
+        )
+        timings.append(float(out.stdout.split()[-1]))
+    return statistics.median(timings)
+
+
+def _served_bytes(model_path, served_as):
+    # Size of the files the app reads: the manifest and parameters for
+    # the artifact, the pickle otherwise.
+    from src.model_artifact import artifact_paths
+
+    paths = artifact_paths(model_path) if served_as == "artifact" else [model_path]
+    return sum(os.path.getsize(p) for p in paths)
+
+
+def compare(data_path=None, engines=None, load_repeats=3):
+    import numpy as np
+
+    from src.evaluation import POSITIVE_CLASS, roc_auc, threshold_sweep
+    from src.model_training import build_pipeline, load_split, save_model
+    from src.resources import DATA_PATH, load_model
+
+    data_path = data_path or DATA_PATH
+    X_train, X_test, y_train, y_test = load_split(data_path)
+    rng = np.random.default_rng(0)
+    batch = X_test.iloc[rng.integers(0, len(X_test), BATCH_ROWS)].reset_index(drop=True)
+    single = X_test.iloc[:1]
+    positive = (y_test.astype(str) == POSITIVE_CLASS).to_numpy()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for engine in engines or list(ENGINES):
+            start = time.perf_counter()
+            pipeline = build_pipeline(engine).fit(X_train, y_train)
+            fit_seconds = time.perf_counter() - start
+
+            path = os.path.join(workdir, os.path.basename(engine_model_path(engine)))
+            save_model(pipeline, path, data_path)
+            # Timed as served: the NumPy artifact for linear engines.
+            model = load_model(path)
+            served_as = "pickle" if hasattr(model, "named_steps") else "artifact"
+            classes = list(model.classes_)
+            scores = model.predict_proba(X_test)[:, classes.index(POSITIVE_CLASS)]
+
+            results[engine] = {
+                "accuracy": float(np.mean(model.predict(X_test) == y_test.to_numpy())),
+                "roc_auc": roc_auc(threshold_sweep(positive, scores)),
+                "fit_seconds": fit_seconds,
+                "single_row_seconds": _median_seconds(
+                    lambda: model.predict_proba(single), SINGLE_ROW_REPEATS),
+                "batch_seconds": _median_seconds(lambda: model.predict_proba(batch), 3),
+                "batch_rows": BATCH_ROWS,
+                "artifact_bytes": _served_bytes(path, served_as),
+                "load_seconds": _load_seconds(path, load_repeats),
+                "served_as": served_as,
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the model engines.")
+    parser.add_argument("--data", default=None)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=None)
+    parser.add_argument("--output", default=COMPARISON_PATH)
+    args = parser.parse_args()
+
+    results = compare(args.data, args.engines)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'engine':<18} {'accuracy':>8} {'ROC-AUC':>8} {'1 row ms':>9} "
+          f"{'100k ms':>9} {'size KB':>8} {'load ms':>8}  served as")
+    for engine, r in results.items():
+        print(f"{engine:<18} {r['accuracy']:8.4f} {r['roc_auc']:8.4f} "
+              f"{r['single_row_seconds'] * 1000:9.3f} {r['batch_seconds'] * 1000:9.1f} "
+              f"{r['artifact_bytes'] / 1024:8.1f} {r['load_seconds'] * 1000:8.1f}  {r['served_as']}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# evaluation.py
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.data_loading import DATA_PATH, TARGET_COL, load_loan_data
+from src.decision_rules import APPROVAL_THRESHOLD
+from src.engines import DEFAULT_ENGINE, ENGINES
+
+N_SPLITS = 5
+N_REPEATS = 3
+CALIBRATION_BINS = 10
+POSITIVE_CLASS = "Approved"
+# The app approves when the approval probability, as a percentage, is at
+# least APPROVAL_THRESHOLD; on the 0-1 scale used here that is:
+DECISION_THRESHOLD = APPROVAL_THRESHOLD / 100
+# Thresholds at which the pooled sweep is stored in the report.
+SWEEP_GRID = np.round(np.linspace(0, 1, 101), 2)
+
+
+def evaluation_path(model_path):
+    # Next to the pickle and the artifact: models/loan_model.evaluation.json
+    base, _ = os.path.splitext(model_path)
+    return base + ".evaluation.json"
+
+
+def threshold_sweep(y_true, scores):
+    # Confusion counts at every distinct score from one descending sort:
+    # predicting positive for score >= thresholds[i] gives tp[i] true and
+    # fp[i] false positives.
+    y_true = np.asarray(y_true, dtype=bool)
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(-scores, kind="stable")
+    scores, y_sorted = scores[order], y_true[order]
+    ends = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tp = np.cumsum(y_sorted)[ends]
+    return {
+        "thresholds": scores[ends],
+        "tp": tp,
+        "fp": ends + 1 - tp,
+        "positives": int(y_true.sum()),
+        "negatives": int(len(y_true) - y_true.sum()),
+    }
+
+
+def roc_auc(sweep):
+    tpr = np.r_[0.0, sweep["tp"] / max(sweep["positives"], 1)]
+    fpr = np.r_[0.0, sweep["fp"] / max(sweep["negatives"], 1)]
+    return float(np.trapz(tpr, fpr))
+
+
+def at_thresholds(sweep, thresholds):
+    # Precision, recall, FPR and accuracy for an array of thresholds, by
+    # binary search in the sweep rather than re-scoring.
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=np.float64))
+    k = np.searchsorted(-sweep["thresholds"], -thresholds, side="right")
+    tp = np.where(k > 0, sweep["tp"][np.maximum(k - 1, 0)], 0)
+    fp = np.where(k > 0, sweep["fp"][np.maximum(k - 1, 0)], 0)
+    predicted = tp + fp
+    total = sweep["positives"] + sweep["negatives"]
+    precision = np.divide(tp, predicted, out=np.ones(len(tp)), where=predicted > 0)
+    recall = tp / max(sweep["positives"], 1)
+    f1 = np.divide(2 * precision * recall, precision + recall,
+                   out=np.zeros(len(tp)), where=precision + recall > 0)
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "fpr": fp / max(sweep["negatives"], 1),
+        "accuracy": (tp + sweep["negatives"] - fp) / total,
+    }
+
+
+def calibration_bins(y_true, scores, n_bins=CALIBRATION_BINS):
+    y_true = np.asarray(y_true, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    bins = np.minimum((scores * n_bins).astype(int), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    predicted = np.bincount(bins, weights=scores, minlength=n_bins)
+    observed = np.bincount(bins, weights=y_true, minlength=n_bins)
+    nonempty = counts > 0
+    mean_predicted = np.divide(predicted, counts, out=np.zeros(n_bins), where=nonempty)
+    observed_rate = np.divide(observed, counts, out=np.zeros(n_bins), where=nonempty)
+    return {
+        "edges": np.linspace(0, 1, n_bins + 1).tolist(),
+        "count": counts.tolist(),
+        "mean_predicted": mean_predicted.tolist(),
+        "observed_rate": observed_rate.tolist(),
+        # Expected calibration error: bin gaps weighted by bin size.
+        "ece": float(np.sum(counts * np.abs(mean_predicted - observed_rate)) / counts.sum()),
+    }
+
+
+def fold_metrics(y_true, scores):
+    sweep = threshold_sweep(y_true, scores)
+    at = at_thresholds(sweep, DECISION_THRESHOLD)
+    return {
+        "roc_auc": roc_auc(sweep),
+        "precision": float(at["precision"][0]),
+        "recall": float(at["recall"][0]),
+        "f1": float(at["f1"][0]),
+        "accuracy": float(at["accuracy"][0]),
+        "brier": float(np.mean((np.asarray(scores) - np.asarray(y_true, dtype=np.float64)) ** 2)),
+    }
+
+
+def _fit_fold(X, y, train_idx, test_idx, engine, model_params):
+    from src.model_training import build_pipeline
+
+    pipeline = build_pipeline(engine, **model_params)
+    pipeline.fit(X.iloc[train_idx], y.iloc[train_idx])
+    classes = list(pipeline.classes_)
+    scores = pipeline.predict_proba(X.iloc[test_idx])[:, classes.index(POSITIVE_CLASS)]
+    return test_idx, scores
+
+
+def evaluate(X, y, model_params=None, n_splits=N_SPLITS, n_repeats=N_REPEATS, n_jobs=-1,
+             engine=DEFAULT_ENGINE):
+    # Repeated stratified k-fold of build_pipeline(engine, **model_params), every
+    # fold fitted in parallel. Fold metrics are summarized as mean and
+    # std; the threshold sweep and calibration pool the out-of-fold
+    # scores of all repeats.
+    from sklearn.model_selection import RepeatedStratifiedKFold
+
+    from src.model_training import RANDOM_STATE
+
+    model_params = dict(model_params or {})
+    start = time.perf_counter()
+    splitter = RepeatedStratifiedKFold(n_splits=n_splits, n_repeats=n_repeats,
+                                       random_state=RANDOM_STATE)
+    folds = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(X, y, train_idx, test_idx, engine, model_params)
+        for train_idx, test_idx in splitter.split(X, y)
+    )
+
+    positive = (y.astype(str) == POSITIVE_CLASS).to_numpy()
+    per_fold = [fold_metrics(positive[idx], scores) for idx, scores in folds]
+    pooled_y = np.concatenate([positive[idx] for idx, _ in folds])
+    pooled_scores = np.concatenate([scores for _, scores in folds])
+
+    sweep = threshold_sweep(pooled_y, pooled_scores)
+    grid = at_thresholds(sweep, SWEEP_GRID)
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "n_rows": int(len(y)),
+        "n_splits": n_splits,
+        "n_repeats": n_repeats,
+        "engine": engine,
+        "model_params": {**ENGINES[engine]["params"], **model_params},
+        "positive_class": POSITIVE_CLASS,
+        "decision_threshold": DECISION_THRESHOLD,
+        "metrics": {
+            name: {
+                "mean": float(np.mean([m[name] for m in per_fold])),
+                "std": float(np.std([m[name] for m in per_fold])),
+                "folds": [m[name] for m in per_fold],
+            }
+            for name in per_fold[0]
+        },
+        "pooled_roc_auc": roc_auc(sweep),
+        "calibration": calibration_bins(pooled_y, pooled_scores),
+        "threshold_sweep": {
+            "thresholds": SWEEP_GRID.tolist(),
+            **{name: values.tolist() for name, values in grid.items()},
+        },
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def write_report(report, path, model_path=None):
+    # model_path: the model fitted with these settings by train(); its
+    # hash ties the report to the pickle it sits next to. Standalone
+    # reports of the settings alone (main() below) record None.
+    from src.resources import file_hash
+
+    report = dict(report, pipeline_sha256=file_hash(model_path) if model_path else None)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    os.replace(tmp, path)
+    return path
+
+
+def print_summary(report):
+    print(f"{report['n_repeats']}x{report['n_splits']}-fold CV on {report['n_rows']} rows "
+          f"in {report['seconds']:.2f}s (threshold {report['decision_threshold']:g})")
+    for name, m in report["metrics"].items():
+        print(f"{name:>10}: {m['mean']:.4f} +/- {m['std']:.4f}")
+    print(f"       ECE: {report['calibration']['ece']:.4f}")
+
+
+def main():
+    from src.model_training import DROP_COLS
+
+    parser = argparse.ArgumentParser(description="Cross-validated evaluation of the model settings.")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=DEFAULT_ENGINE)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--output", default=None,
+                        help="report path (default: benchmarks/evaluation-<engine>.json)")
+    parser.add_argument("--folds", type=int, default=N_SPLITS)
+    parser.add_argument("--repeats", type=int, default=N_REPEATS)
+    parser.add_argument("--jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    df = load_loan_data(args.data)
+    report = evaluate(df.drop(columns=DROP_COLS), df[TARGET_COL], None,
+                      args.folds, args.repeats, args.jobs, args.engine)
+    print_summary(report)
+    # Not next to the model: no pickle was fitted here for the report to
+    # describe, and train() owns that file.
+    path = args.output or os.path.join("benchmarks", f"evaluation-{args.engine}.json")
+    print(f"Report written to {write_report(report, path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# explanations.py
+
+import numpy as np
+import pandas as pd
+
+from src.decision_rules import approved_class_index
+from src.engines import is_linear
+from src.fast_scorer import LinearScorer, export_scorer
+
+DEFAULT_TOP = 3
+# Tree leaves can be pure, so their probabilities are clipped before
+# taking logs.
+LOG_ODDS_CLIP = 1e-6
+
+FEATURE_LABELS = {
+    "no_of_dependents": "Dependents",
+    "income_annum": "Annual income",
+    "loan_amount": "Loan amount",
+    "loan_term": "Loan term",
+    "cibil_score": "CIBIL score",
+    "residential_assets_value": "Residential assets",
+    "commercial_assets_value": "Commercial assets",
+    "luxury_assets_value": "Luxury assets",
+    "bank_asset_value": "Bank assets",
+    "education": "Education",
+    "self_employed": "Self employed",
+}
+
+
+def linear_scorer(model):
+    # The served model is either the NumPy kernel already or the sklearn
+    # pipeline it is folded from.
+    if isinstance(model, LinearScorer):
+        return model
+    return export_scorer(model)
+
+
+def _reference_values(pipeline):
+    # The median applicant: what the fitted imputers fill in per column.
+    values = {}
+    for name, steps, cols in pipeline.named_steps["preprocessor"].transformers_:
+        if hasattr(steps, "named_steps") and "imputer" in steps.named_steps:
+            values.update(zip(cols, steps.named_steps["imputer"].statistics_))
+    return values
+
+
+def _approval_log_odds(model, frame):
+    # Boosting exposes its raw log-odds, which do not saturate the way
+    # its probabilities do far from the boundary.
+    if hasattr(model, "decision_function"):
+        scores = model.decision_function(frame)
+        return scores if approved_class_index(model) == 1 else -scores
+    p = model.predict_proba(frame)[:, approved_class_index(model)]
+    p = np.clip(p, LOG_ODDS_CLIP, 1 - LOG_ODDS_CLIP)
+    return np.log(p / (1 - p))
+
+
+def _occlusion_contributions(model, X):
+    # Non-linear engines have no exact split of the score. A column's term
+    # is how much the approval log-odds drop when only that column is
+    # reset to the median applicant's value: one batched predict_proba
+    # per column, and the terms no longer sum to the total.
+    frame = pd.DataFrame([X]) if isinstance(X, dict) else pd.DataFrame(X)
+    reference_values = _reference_values(model)
+    names = [col for col in FEATURE_LABELS if col in reference_values]
+
+    scores = _approval_log_odds(model, frame)
+    reference_row = frame.iloc[:1].assign(**{col: reference_values[col] for col in names})
+    reference = float(_approval_log_odds(model, reference_row)[0])
+    terms = np.empty((len(frame), len(names)))
+    for j, col in enumerate(names):
+        terms[:, j] = scores - _approval_log_odds(model, frame.assign(**{col: reference_values[col]}))
+    return reference, terms, names
+
+
+def approval_contributions(model, X):
+    # Per-column log-odds of approval relative to a median applicant,
+    # for every row at once. Positive terms raise the approval odds.
+    if not is_linear(model):
+        return _occlusion_contributions(model, X)
+    scorer = linear_scorer(model)
+    reference, terms = scorer.contributions(X)
+    names = scorer.numerical_cols + scorer.categorical_cols
+    if approved_class_index(scorer) == 0:
+        reference, terms = -reference, -terms
+    return reference, terms, names
+
+
+def top_drivers(terms, k=DEFAULT_TOP):
+    # Column indices of the k largest positive and k largest negative
+    # terms per row, strongest first; *_valid is False where a row has
+    # fewer than k terms of that sign.
+    k = min(k, terms.shape[1])
+    order = np.argsort(terms, axis=1, kind="stable")
+    negative = order[:, :k]
+    positive = order[:, ::-1][:, :k]
+    rows = np.arange(len(terms))[:, None]
+    return positive, terms[rows, positive] > 0, negative, terms[rows, negative] < 0
+
+
+def explain_rows(model, frame, k=DEFAULT_TOP):
+    # Drivers for every row of frame from one batched contributions call,
+    # for callers that render each applicant separately (form, PDFs).
+    reference, terms, names = approval_contributions(model, frame)
+    positive, positive_valid, negative, negative_valid = top_drivers(terms, k)
+    reference_probability = float(100 / (1 + np.exp(-reference)))
+
+    def drivers(i, row, indices, valid):
+        return [
+            {
+                "feature": names[j],
+                "label": FEATURE_LABELS.get(names[j], names[j]),
+                "value": row[names[j]].item() if hasattr(row[names[j]], "item") else row[names[j]],
+                "contribution": float(terms[i, j]),
+            }
+            for j, ok in zip(indices[i], valid[i]) if ok
+        ]
+
+    explanations = []
+    for i, (_, row) in enumerate(frame.iterrows()):
+        explanations.append({
+            "reference_probability": reference_probability,
+            "positive": drivers(i, row, positive, positive_valid),
+            "negative": drivers(i, row, negative, negative_valid),
+        })
+    return explanations
+
+
+def explain(model, frame, k=DEFAULT_TOP):
+    # Drivers for the first row of frame, as shown on the form and PDF.
+    return explain_rows(model, frame.iloc[:1], k)[0]
+
+
+def describe(driver):
+    value = driver["value"]
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        value = f"{value:,.0f}"
+    return f"{driver['label']}: {value}"
+
+
+def explain_frame(model, frame, k=DEFAULT_TOP):
+    # Bulk mode: names of the top k drivers of each sign per row, as
+    # columns top_positive_1..k and top_negative_1..k ("" when a row has
+    # fewer drivers of that sign). No per-row Python work.
+    _, terms, names = approval_contributions(model, frame)
+    positive, positive_valid, negative, negative_valid = top_drivers(terms, k)
+    names = np.asarray(names, dtype=object)
+
+    columns = {}
+    for sign, indices, valid in (("positive", positive, positive_valid),
+                                 ("negative", negative, negative_valid)):
+        for i in range(indices.shape[1]):
+            columns[f"top_{sign}_{i + 1}"] = np.where(valid[:, i], names[indices[:, i]], "")
+    return pd.DataFrame(columns, index=frame.index)
@@ -0,0 +1,277 @@
+# fast_scorer.py
+
+import numpy as np
+
+# Nothing here imports sklearn or pandas: the exporter only reads fitted
+# attributes off the pipeline, and the scorer is plain NumPy.
+
+
+class LinearScorer:
+    # Median impute + StandardScaler + one-hot encode + a binary linear
+    # model, folded into one weight per numeric column, one weight per
+    # known category and a single intercept. Mirrors the sklearn API that
+    # app.py and batch scoring use (classes_, feature_names_in_,
+    # predict_proba), so it can stand in for the pickled pipeline.
+
+    def __init__(self, feature_names, numerical_cols, categorical_cols,
+                 medians, numeric_weights, categories, category_weights,
+                 category_fill, intercept, classes):
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.numerical_cols = list(numerical_cols)
+        self.categorical_cols = list(categorical_cols)
+        self.medians = np.asarray(medians, dtype=np.float64)
+        self.numeric_weights = np.asarray(numeric_weights, dtype=np.float64)
+        self.categories = [np.asarray(c, dtype=str) for c in categories]
+        self.category_weights = [np.asarray(w, dtype=np.float64) for w in category_weights]
+        self.category_fill = list(category_fill)
+        self.intercept = float(intercept)
+        self.classes_ = np.asarray(classes, dtype=object)
+
+        # searchsorted needs the categories sorted; OneHotEncoder already
+        # sorts them, but don't rely on it.
+        for i, cats in enumerate(self.categories):
+            order = np.argsort(cats)
+            self.categories[i] = cats[order]
+            self.category_weights[i] = self.category_weights[i][order]
+
+    def _columns(self, X):
+        # Returns {column name: 1-D array} for dicts, lists of dicts,
+        # DataFrames and 2-D arrays laid out in feature_names_in_ order.
+        if isinstance(X, dict):
+            return {col: np.asarray([X.get(col)], dtype=object) for col in self.feature_names_in_}
+        if isinstance(X, (list, tuple)) and X and isinstance(X[0], dict):
+            return {
+                col: np.asarray([row.get(col) for row in X], dtype=object)
+                for col in self.feature_names_in_
+            }
+        if hasattr(X, "columns"):
+            # Categorical columns stay as pandas Categoricals (codes plus a
+            # few categories), which _category_contribution scores by code.
+            return {
+                col: X[col].array if hasattr(X[col].array, "codes") else X[col].to_numpy()
+                for col in self.feature_names_in_
+            }
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names_in_):
+            raise ValueError(
+                f"expected a 2-D array with {len(self.feature_names_in_)} columns "
+                f"in the order {list(self.feature_names_in_)}"
+            )
+        return {col: X[:, i] for i, col in enumerate(self.feature_names_in_)}
+
+    def decision_function(self, X):
+        columns = self._columns(X)
+        n_rows = len(next(iter(columns.values())))
+
+        numeric = np.empty((n_rows, len(self.numerical_cols)), dtype=np.float64)
+        for j, col in enumerate(self.numerical_cols):
+            numeric[:, j] = np.asarray(columns[col], dtype=np.float64)
+        missing = np.isnan(numeric)
+        if missing.any():
+            numeric = np.where(missing, self.medians, numeric)
+        scores = numeric @ self.numeric_weights + self.intercept
+
+        for col, cats, weights, fill in zip(self.categorical_cols, self.categories,
+                                            self.category_weights, self.category_fill):
+            scores += self._category_contribution(columns[col], cats, weights, fill)
+        return scores
+
+    @staticmethod
+    def _category_contribution(values, cats, weights, fill):
+        codes = getattr(values, "codes", None)
+        if codes is not None:
+            # Score each category once; code -1 (missing) picks the fill
+            # value's weight from the end of the table.
+            table = LinearScorer._category_contribution(
+                np.append(np.asarray(values.categories, dtype=object), fill), cats, weights, fill)
+            return table[codes]
+
+        values = np.asarray(values, dtype=object)
+        # Only NaN (the only value not equal to itself) is imputed: like
+        # SimpleImputer on object columns, None is left to the encoder and
+        # scored as an unknown category below.
+        missing = values != values
+        if missing.any():
+            values = np.where(missing, fill, values)
+        values = values.astype(str)
+        # Unknown categories contribute nothing, like handle_unknown="ignore".
+        pos = np.minimum(np.searchsorted(cats, values), len(cats) - 1)
+        return np.where(cats[pos] == values, weights[pos], 0.0)
+
+    def contributions(self, X):
+        # Exact split of decision_function into one term per input column,
+        # measured from a reference applicant with the median of every
+        # numeric column and the most frequent category. Returns
+        # (reference score, (n_rows, n_columns) terms) in the column order
+        # numerical_cols + categorical_cols, and the terms of each row sum to
+        # its decision_function minus the reference score.
+        columns = self._columns(X)
+        n_rows = len(next(iter(columns.values())))
+        terms = np.empty((n_rows, len(self.numerical_cols) + len(self.categorical_cols)))
+
+        reference = self.intercept + float(self.medians @ self.numeric_weights)
+        for j, col in enumerate(self.numerical_cols):
+            values = np.asarray(columns[col], dtype=np.float64)
+            values = np.where(np.isnan(values), self.medians[j], values)
+            terms[:, j] = (values - self.medians[j]) * self.numeric_weights[j]
+
+        offset = len(self.numerical_cols)
+        for j, (col, cats, weights, fill) in enumerate(zip(
+                self.categorical_cols, self.categories, self.category_weights, self.category_fill)):
+            fill_weight = self._category_contribution([fill], cats, weights, fill)[0]
+            reference += fill_weight
+            terms[:, offset + j] = self._category_contribution(
+                columns[col], cats, weights, fill) - fill_weight
+        return reference, terms
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+class Float32Scorer:
+    # A LinearScorer's parameters cast to float32, for batch jobs where
+    # the float64 matrices cost twice the memory and bandwidth the model
+    # needs. Each chunk's columns are copied straight into float32
+    # buffers that are allocated for the largest chunk seen and reused,
+    # and the probabilities are computed in place in one of them. The
+    # returned array is overwritten by the next call.
+
+    def __init__(self, scorer):
+        self.scorer = scorer
+        self.medians = scorer.medians.astype(np.float32)
+        self.numeric_weights = scorer.numeric_weights.astype(np.float32)
+        self.intercept = np.float32(scorer.intercept)
+        self._numeric = np.empty((0, len(scorer.numerical_cols)), dtype=np.float32)
+        self._scores = np.empty(0, dtype=np.float32)
+        self._category = np.empty(0, dtype=np.float32)
+        self._tables = {}
+
+    def _reserve(self, n_rows):
+        if n_rows > len(self._scores):
+            self._numeric = np.empty((n_rows, self._numeric.shape[1]), dtype=np.float32)
+            self._scores = np.empty(n_rows, dtype=np.float32)
+            self._category = np.empty(n_rows, dtype=np.float32)
+        return self._numeric[:n_rows], self._scores[:n_rows], self._category[:n_rows]
+
+    def _category_table(self, i, categories):
+        # Contribution of each category of a pandas Categorical, plus the
+        # fill value's at the end for code -1; chunks of one file share
+        # their categories, so this is computed once per file.
+        key = (i, tuple(categories))
+        table = self._tables.get(key)
+        if table is None:
+            scorer = self.scorer
+            table = scorer._category_contribution(
+                np.append(np.asarray(categories, dtype=object), scorer.category_fill[i]),
+                scorer.categories[i], scorer.category_weights[i], scorer.category_fill[i],
+            ).astype(np.float32)
+            self._tables[key] = table
+        return table
+
+    def decision_function(self, X):
+        scorer = self.scorer
+        columns = scorer._columns(X)
+        n_rows = len(next(iter(columns.values())))
+        numeric, scores, category = self._reserve(n_rows)
+
+        for j, col in enumerate(scorer.numerical_cols):
+            numeric[:, j] = columns[col]
+        missing = np.isnan(numeric)
+        if missing.any():
+            np.copyto(numeric, np.broadcast_to(self.medians, numeric.shape), where=missing)
+        np.matmul(numeric, self.numeric_weights, out=scores)
+        scores += self.intercept
+
+        for i, col in enumerate(scorer.categorical_cols):
+            values = columns[col]
+            codes = getattr(values, "codes", None)
+            if codes is not None:
+                np.take(self._category_table(i, values.categories), codes, out=category)
+            else:
+                category[:] = scorer._category_contribution(
+                    values, scorer.categories[i], scorer.category_weights[i],
+                    scorer.category_fill[i])
+            scores += category
+        return scores
+
+    def positive_probability(self, X):
+        # 1 / (1 + exp(-score)), in place in the scores buffer.
+        p = self.decision_function(X)
+        np.negative(p, out=p)
+        np.exp(p, out=p)
+        p += 1
+        np.reciprocal(p, out=p)
+        return p
+
+
+def export_scorer(pipeline):
+    preprocessor = pipeline.named_steps["preprocessor"]
+    model = pipeline.named_steps["model"]
+    if not hasattr(model, "coef_"):
+        raise ValueError(f"{type(model).__name__} is not a linear model and cannot be exported")
+    coef = np.ravel(model.coef_)
+    transformers = {name: (steps, cols) for name, steps, cols in preprocessor.transformers_}
+    num_steps, numerical_cols = transformers["num"]
+    cat_steps, categorical_cols = transformers["cat"]
+
+    imputer = num_steps.named_steps["imputer"]
+    scaler = num_steps.named_steps["scaler"]
+    n_num = len(numerical_cols)
+    num_coef = coef[:n_num]
+
+    # w . (x - mean) / scale + b  ==  (w / scale) . x + (b - w . mean / scale)
+    numeric_weights = num_coef / scaler.scale_
+    intercept = float(np.ravel(model.intercept_)[0]) - float(
+        np.dot(num_coef, scaler.mean_ / scaler.scale_))
+
+    encoder = cat_steps.named_steps["encoder"]
+    if len(model.classes_) != 2 or len(coef) != n_num + sum(len(c) for c in encoder.categories_):
+        raise ValueError("only binary linear models over get_preprocessor() can be exported")
+
+    category_fill = [str(v) for v in cat_steps.named_steps["imputer"].statistics_]
+    category_weights = []
+    offset = n_num
+    for cats in encoder.categories_:
+        category_weights.append(coef[offset:offset + len(cats)])
+        offset += len(cats)
+
+    feature_names = getattr(pipeline, "feature_names_in_", list(numerical_cols) + list(categorical_cols))
+    return LinearScorer(
+        feature_names=feature_names,
+        numerical_cols=numerical_cols,
+        categorical_cols=categorical_cols,
+        medians=imputer.statistics_,
+        numeric_weights=numeric_weights,
+        categories=[[str(c) for c in cats] for cats in encoder.categories_],
+        category_weights=category_weights,
+        category_fill=category_fill,
+        intercept=intercept,
+        classes=model.classes_,
+    )
+
+
+def max_probability_difference(pipeline, scorer, frame):
+    expected = pipeline.predict_proba(frame)
+    actual = scorer.predict_proba(frame)
+    return float(np.max(np.abs(expected - actual)))
+
+
+def main():
+    from src.resources import load_dataset, load_pipeline
+
+    pipeline = load_pipeline()
+    scorer = export_scorer(pipeline)
+
+    frame = load_dataset()
+    diff = max_probability_difference(pipeline, scorer, frame)
+    print(f"Max |sklearn - kernel| probability difference over {len(frame)} rows: {diff:.3e}")
+    if diff > 1e-9:
+        raise SystemExit("Kernel does not match the sklearn pipeline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# instrumentation.py
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Empty LOAN_METRICS_PATH turns the file export off.
+METRICS_PATH = os.environ.get("LOAN_METRICS_PATH", os.path.join("metrics", "prediction.prom"))
+DEBUG_TIMINGS = os.environ.get("LOAN_DEBUG_TIMINGS", "") not in ("", "0", "false")
+
+# Histogram bucket upper bounds, in seconds.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_lock = threading.Lock()
+_stages = {}
+
+
+def record(stage, seconds, timings=None):
+    # Cheap enough for every request: one lock and a short bucket scan.
+    with _lock:
+        hist = _stages.get(stage)
+        if hist is None:
+            hist = _stages[stage] = {"count": 0, "sum": 0.0, "buckets": [0] * len(BUCKETS)}
+        hist["count"] += 1
+        hist["sum"] += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][i] += 1
+                break
+    if timings is not None:
+        timings[stage] = seconds
+
+
+@contextmanager
+def timed(stage, timings=None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start, timings)
+
+
+def snapshot():
+    with _lock:
+        return {
+            stage: {"count": h["count"], "sum": h["sum"], "buckets": list(h["buckets"])}
+            for stage, h in _stages.items()
+        }
+
+
+def prometheus_text(prefix="loan_prediction"):
+    lines = [
+        f"# HELP {prefix}_stage_total Completed runs of each prediction stage.",
+        f"# TYPE {prefix}_stage_total counter",
+    ]
+    stages = snapshot()
+    for stage, h in sorted(stages.items()):
+        lines.append(f'{prefix}_stage_total{{stage="{stage}"}} {h["count"]}')
+
+    lines += [
+        f"# HELP {prefix}_stage_seconds Latency of each prediction stage.",
+        f"# TYPE {prefix}_stage_seconds histogram",
+    ]
+    for stage, h in sorted(stages.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, h["buckets"]):
+            cumulative += count
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h["count"]}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {h["sum"]:.9f}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {h["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def export_metrics(path=METRICS_PATH):
+    # Written atomically so a scraper (e.g. node_exporter's textfile
+    # collector) never reads a half-written file.
+    if not path:
+        return
+    # Every session thread exports, so each call needs its own temp file.
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        # mkstemp creates the file owner-only; the scraper may run as
+        # another user.
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            f.write(prometheus_text())
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def reset():
+    with _lock:
+        _stages.clear()
@@ -0,0 +1,171 @@
+# model_artifact.py
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from src.fast_scorer import LinearScorer, export_scorer
+
+# Importing this module must not pull in sklearn or pandas: the app loads
+# the artifact on cold start and only needs NumPy to score with it.
+
+FORMAT_VERSION = 1
+
+
+def artifact_paths(model_path):
+    base, _ = os.path.splitext(model_path)
+    return base + ".manifest.json", base + ".params.npy"
+
+
+def _sha256(path):
+    from src.resources import file_hash
+    return file_hash(path) if os.path.exists(path) else None
+
+
+def save_artifact(pipeline, model_path, data_path):
+    # Written next to the pickle: a JSON manifest with the schema and
+    # provenance, plus one flat float64 array holding every numeric
+    # parameter (sliced by the offsets in the manifest).
+    import sklearn
+
+    scorer = export_scorer(pipeline)
+    manifest_path, params_path = artifact_paths(model_path)
+
+    arrays = {
+        "medians": scorer.medians,
+        "numeric_weights": scorer.numeric_weights,
+        "intercept": np.array([scorer.intercept]),
+    }
+    for col, weights in zip(scorer.categorical_cols, scorer.category_weights):
+        arrays[f"category_weights.{col}"] = weights
+
+    offsets = {}
+    position = 0
+    for name, values in arrays.items():
+        offsets[name] = [position, len(values)]
+        position += len(values)
+    params = np.concatenate([np.asarray(v, dtype=np.float64) for v in arrays.values()])
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_type": type(pipeline.named_steps["model"]).__name__,
+        "sklearn_version": sklearn.__version__,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "training_data_sha256": _sha256(data_path),
+        "pipeline_sha256": _sha256(model_path),
+        "feature_names": [str(f) for f in scorer.feature_names_in_],
+        "numerical_cols": scorer.numerical_cols,
+        "categorical_cols": scorer.categorical_cols,
+        "categories": {col: [str(c) for c in cats]
+                       for col, cats in zip(scorer.categorical_cols, scorer.categories)},
+        "category_fill": dict(zip(scorer.categorical_cols, scorer.category_fill)),
+        "classes": [str(c) for c in scorer.classes_],
+        "params_file": os.path.basename(params_path),
+        "params": offsets,
+    }
+
+    np.save(params_path, params)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+def read_manifest(manifest_path):
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"{manifest_path} has format version {manifest.get('format_version')}, "
+            f"expected {FORMAT_VERSION}"
+        )
+    return manifest
+
+
+def load_artifact(manifest_path):
+    manifest = read_manifest(manifest_path)
+    params_path = os.path.join(os.path.dirname(manifest_path), manifest["params_file"])
+    params = np.load(params_path, mmap_mode="r")
+
+    def param(name):
+        start, length = manifest["params"][name]
+        return params[start:start + length]
+
+    categorical_cols = manifest["categorical_cols"]
+    return LinearScorer(
+        feature_names=manifest["feature_names"],
+        numerical_cols=manifest["numerical_cols"],
+        categorical_cols=categorical_cols,
+        medians=param("medians"),
+        numeric_weights=param("numeric_weights"),
+        categories=[manifest["categories"][col] for col in categorical_cols],
+        category_weights=[param(f"category_weights.{col}") for col in categorical_cols],
+        category_fill=[manifest["category_fill"][col] for col in categorical_cols],
+        intercept=param("intercept")[0],
+        classes=manifest["classes"],
+    )
+
+
+_PICKLE_STARTUP = """
+import pickle, sys, time
+start = time.perf_counter()
+with open({path!r}, "rb") as f:
+    pickle.load(f)
+print(time.perf_counter() - start, "sklearn" in sys.modules)
+"""
+
+_ARTIFACT_STARTUP = """
+import sys, time
+start = time.perf_counter()
+from src.model_artifact import load_artifact
+load_artifact({path!r})
+print(time.perf_counter() - start, "sklearn" in sys.modules)
+"""
+
+
+def compare_startup(model_path, repeats=5):
+    # Each load runs in a fresh interpreter, so import costs are included.
+    manifest_path, _ = artifact_paths(model_path)
+    results = {}
+    for name, script, path in [("pickle", _PICKLE_STARTUP, model_path),
+                               ("artifact", _ARTIFACT_STARTUP, manifest_path)]:
+        timings = []
+        for _ in range(repeats):
+            out = subprocess.run(
+                [sys.executable, "-c", script.format(path=path)],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            timings.append(float(out[0]))
+        results[name] = {
+            "median_seconds": statistics.median(timings),
+            "imports_sklearn": out[1] == "True",
+        }
+    return results
+
+
+def main():
+    from src.resources import DATA_PATH, MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Export or benchmark the model artifact.")
+    parser.add_argument("command", choices=["export", "compare"])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from src.resources import load_pipeline
+        print("Wrote", save_artifact(load_pipeline(args.model), args.model, args.data))
+    else:
+        for name, result in compare_startup(args.model, args.repeats).items():
+            print(f"{name:>8}: {result['median_seconds'] * 1000:8.1f} ms "
+                  f"(imports sklearn: {result['imports_sklearn']})")
+
+
+if __name__ == "__main__":
+    main()
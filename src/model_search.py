@@ -0,0 +1,93 @@
+# model_search.py
+
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import classification_report, f1_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+from scipy.stats import loguniform
+
+from src.data_loading import DATA_PATH
+from src.data_preprocessing import get_preprocessor
+from src.model_training import (
+    MODEL_PARAMS, MODEL_PATH, RANDOM_STATE, build_pipeline, load_split, save_model,
+)
+
+PARAM_GRID = {
+    "C": [0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0],
+    "class_weight": [None, "balanced"],
+}
+
+PARAM_DISTRIBUTIONS = {
+    "C": loguniform(1e-3, 1e2),
+    "class_weight": [None, "balanced"],
+}
+
+
+def transform_folds(X, y, n_splits):
+    # get_preprocessor() is fitted once per fold; every candidate then
+    # trains on the same already-imputed, scaled and encoded matrices.
+    folds = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE)
+
+    def transform(train_idx, val_idx):
+        preprocessor = get_preprocessor()
+        X_tr = preprocessor.fit_transform(X.iloc[train_idx])
+        X_va = preprocessor.transform(X.iloc[val_idx])
+        return X_tr, y.iloc[train_idx].to_numpy(), X_va, y.iloc[val_idx].to_numpy()
+
+    return Parallel(n_jobs=-1)(
+        delayed(transform)(train_idx, val_idx) for train_idx, val_idx in folds.split(X, y)
+    )
+
+
+def _evaluate(params, folds):
+    start = time.perf_counter()
+    model = LogisticRegression(**{**MODEL_PARAMS, **params})
+    scores = []
+    for X_tr, y_tr, X_va, y_va in folds:
+        fitted = clone(model).fit(X_tr, y_tr)
+        scores.append(f1_score(y_va, fitted.predict(X_va), average="macro"))
+    return {
+        "params": params,
+        "mean_score": float(np.mean(scores)),
+        "std_score": float(np.std(scores)),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def candidates(strategy="grid", n_iter=20):
+    if strategy == "random":
+        return list(ParameterSampler(PARAM_DISTRIBUTIONS, n_iter, random_state=RANDOM_STATE))
+    return list(ParameterGrid(PARAM_GRID))
+
+
+def search(data_path=DATA_PATH, model_path=MODEL_PATH, strategy="grid", n_iter=20, n_splits=5):
+    X_train, X_test, y_train, y_test = load_split(data_path)
+
+    start = time.perf_counter()
+    folds = transform_folds(X_train, y_train, n_splits)
+    print(f"Preprocessed {n_splits} folds in {time.perf_counter() - start:.2f}s")
+
+    results = Parallel(n_jobs=-1)(
+        delayed(_evaluate)(params, folds) for params in candidates(strategy, n_iter)
+    )
+    results.sort(key=lambda r: r["mean_score"], reverse=True)
+
+    print(f"{'macro F1':>10} {'std':>7} {'seconds':>8}  params")
+    for r in results:
+        print(f"{r['mean_score']:10.4f} {r['std_score']:7.4f} {r['seconds']:8.3f}  {r['params']}")
+
+    best = results[0]["params"]
+    print(f"Best settings: {best}")
+
+    # Refit the winner as a full pipeline on the training split
+    pipeline = build_pipeline(**best)
+    pipeline.fit(X_train, y_train)
+    print(classification_report(y_test, pipeline.predict(X_test)))
+
+    save_model(pipeline, model_path, data_path)
+    print("Model trained and saved successfully")
+    return pipeline, results
@@ -1,49 +1,338 @@
 # model_training.py
 
-import pandas as pd
-import pickle
+import argparse
 import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import classification_report
-from src.data_preprocessing import get_preprocessor
-
-
-# Load data
-DATA_PATH = os.path.join("data", "loan_data.csv")
-df = pd.read_csv(DATA_PATH)
-df.columns = df.columns.str.strip()
-df["loan_status"] = df["loan_status"].str.strip().str.capitalize()
-
-X = df.drop(columns=["loan_id", "loan_status"])
-y = df["loan_status"]
-
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-# Pipeline
-pipeline = Pipeline([
-    ("preprocessor", get_preprocessor()),
-    ("model", LogisticRegression(
-        max_iter=2000,
-        class_weight="balanced",
-        C=0.5
-    ))
-])
-
-# Train
-pipeline.fit(X_train, y_train)
-
-# Evaluate
-y_pred = pipeline.predict(X_test)
-print(classification_report(y_test, y_pred))
-os.makedirs("models", exist_ok=True)
-
-# SAVE MODEL
-with open(os.path.join("models", "loan_model.pkl"), "wb") as f:
-    pickle.dump(pipeline, f)
-
-print("Model trained and saved successfully")
+
+from src.data_loading import DATA_PATH, TARGET_COL, load_loan_data, read_loan_csv
+from src.data_preprocessing import CATEGORICAL_COLS, NUMERICAL_COLS, get_preprocessor
+from src.engines import DEFAULT_ENGINE, ENGINES, build_model, engine_model_path, is_linear
+from src.model_artifact import artifact_paths, save_artifact
+
+MODEL_PATH = engine_model_path(DEFAULT_ENGINE)
+DROP_COLS = ["loan_id", TARGET_COL]
+
+MODEL_PARAMS = ENGINES["logistic"]["params"]
+C = MODEL_PARAMS["C"]
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_EPOCHS = 5
+
+
+def build_pipeline(engine=DEFAULT_ENGINE, **model_params):
+    return Pipeline([
+        ("preprocessor", get_preprocessor()),
+        ("model", build_model(engine, **model_params))
+    ])
+
+
+def save_model(pipeline, model_path=MODEL_PATH, data_path=DATA_PATH):
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    with open(model_path, "wb") as f:
+        pickle.dump(pipeline, f)
+
+    # Fast-loading artifact next to the pickle (see src/model_artifact.py).
+    # Only linear engines have one; a stale one from an earlier linear
+    # model at this path must not be served instead of the new pickle.
+    if is_linear(pipeline):
+        save_artifact(pipeline, model_path, data_path)
+    else:
+        for path in artifact_paths(model_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # The evaluation report next to the pickle described the model just
+    # replaced; train() writes a new one after saving, other callers
+    # (search, streaming, warm start) leave none.
+    from src.evaluation import evaluation_path
+
+    if os.path.exists(evaluation_path(model_path)):
+        os.remove(evaluation_path(model_path))
+
+
+def load_split(data_path=DATA_PATH):
+    # Load data
+    df = load_loan_data(data_path)
+
+    X = df.drop(columns=DROP_COLS)
+    y = df[TARGET_COL]
+
+    # Train-test split
+    return train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
+    )
+
+
+def train(data_path=DATA_PATH, model_path=None, n_splits=None, n_repeats=None,
+          engine=DEFAULT_ENGINE, **model_params):
+    from src.evaluation import (
+        N_REPEATS, N_SPLITS, evaluate, evaluation_path, print_summary, write_report,
+    )
+
+    model_path = model_path or engine_model_path(engine)
+    df = load_loan_data(data_path)
+    X = df.drop(columns=DROP_COLS)
+    y = df[TARGET_COL]
+
+    # Evaluate: repeated stratified k-fold of the same settings, in
+    # parallel (see src/evaluation.py)
+    report = evaluate(X, y, model_params, n_splits or N_SPLITS, n_repeats or N_REPEATS,
+                      engine=engine)
+    print_summary(report)
+
+    # Train on every row; the report estimates how this fit generalizes
+    pipeline = build_pipeline(engine, **model_params)
+    pipeline.fit(X, y)
+
+    save_model(pipeline, model_path, data_path)
+    write_report(report, evaluation_path(model_path), model_path)
+    print("Model trained and saved successfully")
+    return pipeline
+
+
+# Streaming mode: apart from a fixed-size sample per numeric column (for
+# its median), nothing bigger than one chunk is held in memory at any time.
+
+MEDIAN_SAMPLE_SIZE = 100_000
+
+def _holdout_mask(chunk_index, n_rows):
+    # Same rows are held out on every pass because the mask only depends
+    # on the chunk's position in the file.
+    rng = np.random.default_rng([RANDOM_STATE, chunk_index])
+    return rng.random(n_rows) < TEST_SIZE
+
+
+def _chunks(data_path, chunksize, holdout):
+    for i, chunk in enumerate(read_loan_csv(data_path, chunksize=chunksize)):
+        mask = _holdout_mask(i, len(chunk))
+        chunk = chunk[mask] if holdout else chunk[~mask]
+        if len(chunk):
+            yield chunk.drop(columns=DROP_COLS, errors="ignore"), chunk[TARGET_COL].astype(str)
+
+
+class _Reservoir:
+    # Uniform sample of at most `size` values (Algorithm R, one chunk at a
+    # time). Its median is exact until more than `size` values have been
+    # seen, and after that within about 0.5 / sqrt(size) of the median's
+    # rank; only the imputer uses it, for the missing values.
+
+    def __init__(self, size, rng):
+        self.values = np.empty(size, dtype=np.float64)
+        self.filled = 0
+        self.seen = 0
+        self.rng = rng
+
+    def add(self, values):
+        take = min(len(values), len(self.values) - self.filled)
+        self.values[self.filled:self.filled + take] = values[:take]
+        self.filled += take
+        self.seen += take
+        rest = values[take:]
+        if len(rest):
+            # Value i of the rest replaces a random slot with probability
+            # size / (its position in the stream); later values win ties.
+            slots = (self.rng.random(len(rest)) * (self.seen + np.arange(1, len(rest) + 1))).astype(np.int64)
+            keep = slots < len(self.values)
+            self.values[slots[keep]] = rest[keep]
+            self.seen += len(rest)
+
+    def median(self):
+        return float(np.median(self.values[:self.filled])) if self.filled else np.nan
+
+
+def _most_frequent(counts):
+    # Ties go to the smallest value, like SimpleImputer(strategy="most_frequent").
+    best = counts.max()
+    return sorted(counts[counts == best].index)[0]
+
+
+def collect_statistics(data_path, chunksize):
+    # One chunked pass over the training rows. Means and variances are
+    # merged per chunk (Chan et al.); medians come from a fixed-size sample.
+    rng = np.random.default_rng(RANDOM_STATE)
+    samples = {col: _Reservoir(MEDIAN_SAMPLE_SIZE, rng) for col in NUMERICAL_COLS}
+    n = {col: 0 for col in NUMERICAL_COLS}
+    mean = {col: 0.0 for col in NUMERICAL_COLS}
+    m2 = {col: 0.0 for col in NUMERICAL_COLS}
+    missing = {col: 0 for col in NUMERICAL_COLS}
+    category_counts = {col: pd.Series(dtype=np.int64) for col in CATEGORICAL_COLS}
+    class_counts = pd.Series(dtype=np.int64)
+
+    for X, y in _chunks(data_path, chunksize, holdout=False):
+        class_counts = class_counts.add(y.value_counts(), fill_value=0)
+        for col in CATEGORICAL_COLS:
+            counts = X[col].astype(object).value_counts(dropna=True)
+            category_counts[col] = category_counts[col].add(counts, fill_value=0)
+        for col in NUMERICAL_COLS:
+            values = X[col].to_numpy(dtype=np.float64)
+            present = values[~np.isnan(values)]
+            missing[col] += len(values) - len(present)
+            if not len(present):
+                continue
+            samples[col].add(present)
+            n_b, mean_b = len(present), present.mean()
+            m2_b = ((present - mean_b) ** 2).sum()
+            delta = mean_b - mean[col]
+            total = n[col] + n_b
+            mean[col] += delta * n_b / total
+            m2[col] += m2_b + delta ** 2 * n[col] * n_b / total
+            n[col] = total
+
+    medians = np.array([samples[col].median() for col in NUMERICAL_COLS])
+
+    # The scaler sees imputed data, so fold the missing values back in as
+    # copies of the median.
+    means, variances, seen = [], [], []
+    for col, median in zip(NUMERICAL_COLS, medians):
+        n_a, mean_a, m2_a = n[col], mean[col], m2[col]
+        k = missing[col]
+        total = n_a + k
+        if k:
+            delta = median - mean_a
+            mean_a += delta * k / total
+            m2_a += delta ** 2 * n_a * k / total
+        means.append(mean_a)
+        variances.append(m2_a / total)
+        seen.append(total)
+
+    return {
+        "medians": medians,
+        "means": np.array(means),
+        "variances": np.array(variances),
+        "n_samples": int(seen[0]),
+        "categories": [sorted(category_counts[col].index) for col in CATEGORICAL_COLS],
+        "most_frequent": [_most_frequent(category_counts[col]) for col in CATEGORICAL_COLS],
+        "class_counts": class_counts.astype(np.int64),
+    }
+
+
+def build_streaming_preprocessor(stats, first_chunk):
+    # get_preprocessor() fitted on one chunk for its structure, with the
+    # imputer and scaler statistics replaced by the full-pass ones.
+    preprocessor = get_preprocessor(categories=stats["categories"])
+    preprocessor.fit(first_chunk)
+
+    num = preprocessor.named_transformers_["num"]
+    num.named_steps["imputer"].statistics_ = stats["medians"]
+    scaler = num.named_steps["scaler"]
+    scaler.mean_ = stats["means"]
+    scaler.var_ = stats["variances"]
+    scaler.scale_ = np.where(stats["variances"] > 0, np.sqrt(stats["variances"]), 1.0)
+    scaler.n_samples_seen_ = stats["n_samples"]
+
+    cat = preprocessor.named_transformers_["cat"]
+    cat.named_steps["imputer"].statistics_ = np.array(stats["most_frequent"], dtype=object)
+    return preprocessor
+
+
+def confusion_report(confusion, classes, digits=2):
+    # sklearn's classification_report, computed from a confusion matrix
+    # (rows: true class, columns: predicted class) instead of the labels.
+    confusion = np.asarray(confusion, dtype=np.float64)
+    tp = np.diag(confusion)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall,
+                   out=np.zeros_like(tp), where=precision + recall > 0)
+    total = support.sum()
+
+    width = max(len("weighted avg"), *(len(str(c)) for c in classes))
+    lines = [f"{'':>{width}} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}", ""]
+    for row in zip(classes, precision, recall, f1, support):
+        lines.append(f"{str(row[0]):>{width}} {row[1]:>9.{digits}f} {row[2]:>9.{digits}f} "
+                     f"{row[3]:>9.{digits}f} {int(row[4]):>9}")
+    lines.append("")
+    accuracy = tp.sum() / total if total else 0.0
+    lines.append(f"{'accuracy':>{width}} {'':>9} {'':>9} {accuracy:>9.{digits}f} {int(total):>9}")
+    weights = support / total if total else support
+    for name, average in [("macro avg", np.mean), ("weighted avg", lambda v: np.sum(v * weights))]:
+        lines.append(f"{name:>{width}} {average(precision):>9.{digits}f} {average(recall):>9.{digits}f} "
+                     f"{average(f1):>9.{digits}f} {int(total):>9}")
+    return "\n".join(lines) + "\n"
+
+
+def train_streaming(data_path=DATA_PATH, model_path=MODEL_PATH,
+                    chunksize=DEFAULT_CHUNKSIZE, epochs=DEFAULT_EPOCHS):
+    stats = collect_statistics(data_path, chunksize)
+    first_chunk, _ = next(_chunks(data_path, chunksize, holdout=False))
+    preprocessor = build_streaming_preprocessor(stats, first_chunk)
+
+    # LogisticRegression(C) minimizes sum(loss) + ||w||^2 / (2C); SGD's
+    # per-sample objective matches it with alpha = 1 / (C * n).
+    class_counts = stats["class_counts"]
+    classes = np.array(sorted(class_counts.index))
+    class_weight = {
+        cls: class_counts.sum() / (len(classes) * class_counts[cls]) for cls in classes
+    }
+    model = SGDClassifier(
+        loss="log_loss",
+        alpha=1.0 / (C * stats["n_samples"]),
+        class_weight=class_weight,
+        random_state=RANDOM_STATE,
+    )
+
+    # Train
+    rng = np.random.default_rng(RANDOM_STATE)
+    for _ in range(epochs):
+        for X, y in _chunks(data_path, chunksize, holdout=False):
+            order = rng.permutation(len(X))
+            Xt = preprocessor.transform(X.iloc[order])
+            model.partial_fit(Xt, y.to_numpy()[order], classes=classes)
+
+    pipeline = Pipeline([("preprocessor", preprocessor), ("model", model)])
+
+    # Evaluate: confusion counts per chunk, reported straight from the counts
+    confusion = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    for X, y in _chunks(data_path, chunksize, holdout=True):
+        true_codes = np.searchsorted(classes, y.to_numpy())
+        pred_codes = np.searchsorted(classes, pipeline.predict(X))
+        np.add.at(confusion, (true_codes, pred_codes), 1)
+    print(confusion_report(confusion, classes))
+
+    save_model(pipeline, model_path, data_path)
+    print("Model trained and saved successfully")
+    return pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the loan approval model.")
+    parser.add_argument("--mode", choices=["full", "streaming", "search"], default="full",
+                        help="streaming trains over CSV chunks with bounded memory; "
+                             "search tunes the model settings (see src/model_search.py)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=DEFAULT_ENGINE,
+                        help="model behind get_preprocessor() in full mode (see src/engines.py)")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--model", default=None,
+                        help="defaults to the engine's path, models/loan_model.pkl for logistic")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--n-iter", type=int, default=20,
+                        help="candidates to sample with --search random")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="cross-validation repeats for the evaluation report")
+    args = parser.parse_args()
+
+    if args.mode != "full" and args.engine != DEFAULT_ENGINE:
+        parser.error(f"--mode {args.mode} trains the {DEFAULT_ENGINE} engine only")
+    if args.mode == "search":
+        from src.model_search import search
+        search(args.data, args.model or MODEL_PATH, args.search, args.n_iter, args.folds)
+    elif args.mode == "streaming":
+        train_streaming(args.data, args.model or MODEL_PATH, args.chunksize, args.epochs)
+    else:
+        train(args.data, args.model, args.folds, args.repeats, args.engine)
+
+
+if __name__ == "__main__":
+    main()
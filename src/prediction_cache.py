@@ -0,0 +1,78 @@
+# prediction_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.data_preprocessing import FEATURE_COLS
+
+PREDICTION_CACHE_SIZE = int(os.environ.get("LOAN_PREDICTION_CACHE_SIZE", "1024"))
+PREDICTION_CACHE_TTL = float(os.environ.get("LOAN_PREDICTION_CACHE_TTL", "600"))
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_model_version = None
+_stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+
+def feature_key(features):
+    # The eleven form fields in schema order. Numbers are compared as
+    # floats so 700 and 700.0 share an entry.
+    key = []
+    for col in FEATURE_COLS:
+        value = features.get(col)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        key.append(value)
+    return tuple(key)
+
+
+def get_or_compute(features, model_version, compute):
+    # compute() runs only on a miss. Entries are dropped after the TTL,
+    # in LRU order beyond the size limit, and all at once when the model
+    # version changes (i.e. loan_model.pkl or its artifact was replaced).
+    global _model_version
+    key = feature_key(features)
+    now = time.monotonic()
+    with _lock:
+        if model_version != _model_version:
+            if _cache:
+                _stats["invalidations"] += 1
+            _cache.clear()
+            _model_version = model_version
+
+        entry = _cache.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            if now - stored_at <= PREDICTION_CACHE_TTL:
+                _cache.move_to_end(key)
+                _stats["hits"] += 1
+                return value
+            del _cache[key]
+            _stats["expired"] += 1
+        _stats["misses"] += 1
+
+    value = compute()
+
+    with _lock:
+        if model_version == _model_version:
+            _cache[key] = (value, time.monotonic())
+            _cache.move_to_end(key)
+            while len(_cache) > PREDICTION_CACHE_SIZE:
+                _cache.popitem(last=False)
+                _stats["evictions"] += 1
+    return value
+
+
+def prediction_cache_stats():
+    with _lock:
+        stats = dict(_stats, entries=len(_cache))
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+def clear():
+    with _lock:
+        _cache.clear()
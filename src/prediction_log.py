@@ -0,0 +1,277 @@
+# prediction_log.py
+
+import argparse
+import atexit
+import copy
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+from src.data_loading import DATA_PATH, HAS_PARQUET, TARGET_COL, load_loan_data, normalize_frame
+from src.data_preprocessing import CATEGORICAL_COLS, FEATURE_COLS
+from src.engines import is_linear
+
+# Empty LOAN_PREDICTION_LOG_DIR turns logging off.
+LOG_DIR = os.environ.get("LOAN_PREDICTION_LOG_DIR", os.path.join("data", "prediction_log"))
+SEGMENT_ROWS = int(os.environ.get("LOAN_PREDICTION_LOG_SEGMENT_ROWS", "500"))
+FLUSH_SECONDS = float(os.environ.get("LOAN_PREDICTION_LOG_FLUSH_SECONDS", "60"))
+
+# Refresh: how many original training rows are replayed next to the new
+# labels, and how far the warm-started LogisticRegression may move.
+REPLAY_ROWS = 5000
+REFRESH_MAX_ITER = 50
+
+SEGMENT_EXT = ".parquet" if HAS_PARQUET else ".csv"
+RECORD_COLS = ["record_id", "timestamp", "model_version", *FEATURE_COLS,
+               "approval_probability", "decision", "risk_band"]
+
+_lock = threading.Lock()
+_buffer = []
+_last_flush = time.monotonic()
+_sequence = 0
+
+
+def _segment_dir(kind, log_dir):
+    return os.path.join(log_dir, kind)
+
+
+def _write_segment(frame, kind, log_dir=LOG_DIR):
+    # Segments are never modified once written; the name orders them by
+    # creation time and keeps concurrent app processes apart.
+    global _sequence
+    directory = _segment_dir(kind, log_dir)
+    os.makedirs(directory, exist_ok=True)
+    _sequence += 1
+    name = f"segment-{time.time_ns()}-{os.getpid()}-{_sequence}{SEGMENT_EXT}"
+    path = os.path.join(directory, name)
+    tmp = path + ".tmp"
+    if HAS_PARQUET:
+        frame.to_parquet(tmp, index=False)
+    else:
+        frame.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def _read_segment(path):
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+
+def segments(kind, log_dir=LOG_DIR):
+    paths = glob.glob(os.path.join(_segment_dir(kind, log_dir), "segment-*"))
+    return sorted((p for p in paths if not p.endswith(".tmp")), key=os.path.basename)
+
+
+def read_segments(kind, log_dir=LOG_DIR, paths=None):
+    paths = segments(kind, log_dir) if paths is None else paths
+    if not paths:
+        return pd.DataFrame()
+    return pd.concat([_read_segment(p) for p in paths], ignore_index=True)
+
+
+def flush(log_dir=LOG_DIR):
+    global _last_flush
+    with _lock:
+        records = list(_buffer)
+        _buffer.clear()
+        _last_flush = time.monotonic()
+    if records and log_dir:
+        _write_segment(pd.DataFrame(records, columns=RECORD_COLS), "predictions", log_dir)
+
+
+def log_prediction(features, approval_probability, approved, risk, model_version):
+    # Buffered in memory and written as one segment every SEGMENT_ROWS
+    # records or FLUSH_SECONDS, and when the process exits.
+    if not LOG_DIR:
+        return None
+    record_id = uuid.uuid4().hex
+    features = dict(features)
+    for col in CATEGORICAL_COLS:
+        # Stored as text, so every segment has the same schema whatever
+        # type the caller passed.
+        if features.get(col) is not None:
+            features[col] = str(features[col])
+    record = {
+        "record_id": record_id,
+        "timestamp": pd.Timestamp.now(tz="UTC"),
+        "model_version": model_version,
+        **{col: features.get(col) for col in FEATURE_COLS},
+        "approval_probability": float(approval_probability),
+        "decision": "Approved" if approved else "Rejected",
+        "risk_band": str(risk),
+    }
+    with _lock:
+        _buffer.append(record)
+        due = (len(_buffer) >= SEGMENT_ROWS
+               or time.monotonic() - _last_flush >= FLUSH_SECONDS)
+    if due:
+        flush()
+    return record_id
+
+
+atexit.register(flush)
+
+
+def add_labels(labels, log_dir=LOG_DIR):
+    # labels: frame with record_id and loan_status ("Approved"/"Rejected")
+    # for decisions whose outcome is now known.
+    labels = normalize_frame(labels[["record_id", TARGET_COL]].copy())
+    labels[TARGET_COL] = labels[TARGET_COL].astype(str)
+    labels["labeled_at"] = pd.Timestamp.now(tz="UTC")
+    return _write_segment(labels, "labels", log_dir)
+
+
+def compact(log_dir=LOG_DIR):
+    # Folds the prediction segments into one, for logs that have
+    # accumulated many small segments. Labels are left alone because the
+    # refresh state refers to them by name.
+    paths = segments("predictions", log_dir)
+    if len(paths) < 2:
+        return len(paths)
+    _write_segment(read_segments("predictions", log_dir, paths), "predictions", log_dir)
+    for path in paths:
+        os.remove(path)
+    return len(paths)
+
+
+def _state_path(log_dir):
+    return os.path.join(log_dir, "refresh_state.json")
+
+
+def _read_state(log_dir):
+    try:
+        with open(_state_path(log_dir)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"consumed_labels": []}
+
+
+def new_labeled_records(log_dir=LOG_DIR):
+    # Logged inputs joined with labels added since the last refresh. The
+    # latest label wins when a record was labeled more than once.
+    state = _read_state(log_dir)
+    consumed = set(state["consumed_labels"])
+    label_paths = [p for p in segments("labels", log_dir)
+                   if os.path.basename(p) not in consumed]
+    labels = read_segments("labels", log_dir, label_paths)
+    if labels.empty:
+        return pd.DataFrame(), label_paths
+    labels = labels.drop_duplicates("record_id", keep="last")
+
+    records = read_segments("predictions", log_dir)
+    if records.empty:
+        return pd.DataFrame(), label_paths
+    joined = records.merge(labels[["record_id", TARGET_COL]], on="record_id", how="inner")
+    return joined, label_paths
+
+
+def warm_start(pipeline, X, y, replay=None):
+    # The fitted preprocessor is kept as is, so the new coefficients live
+    # in the same scaled feature space as the old ones. SGD models take a
+    # partial_fit step on the new rows. LogisticRegression restarts lbfgs
+    # from its current coefficients with a small iteration budget, on the
+    # new rows plus a bounded replay of the original training data.
+    pipeline = copy.deepcopy(pipeline)
+    preprocessor = pipeline.named_steps["preprocessor"]
+    model = pipeline.named_steps["model"]
+
+    if hasattr(model, "partial_fit"):
+        model.partial_fit(preprocessor.transform(X), y.to_numpy())
+        return pipeline
+
+    if replay is not None:
+        X = pd.concat([X, replay[0]], ignore_index=True)
+        y = pd.concat([y, replay[1]], ignore_index=True)
+    if is_linear(model):
+        model.set_params(warm_start=True, max_iter=REFRESH_MAX_ITER)
+    # Trees and boosting cannot resume from their fitted state, so other
+    # engines are refitted on the same rows; a full retrain with
+    # python -m src.model_training --engine uses all of the data.
+    model.fit(preprocessor.transform(X), y.to_numpy())
+    return pipeline
+
+
+def refresh(log_dir=LOG_DIR, model_path=None, data_path=DATA_PATH):
+    from sklearn.metrics import accuracy_score, log_loss
+
+    from src.model_training import RANDOM_STATE, save_model
+    from src.resources import MODEL_PATH, load_pipeline
+
+    model_path = model_path or MODEL_PATH
+    flush(log_dir)
+    records, label_paths = new_labeled_records(log_dir)
+    if records.empty:
+        print("No new labeled records")
+        return None
+
+    X = normalize_frame(records[FEATURE_COLS].copy())
+    y = records[TARGET_COL].astype(str)
+    history = load_loan_data(data_path)
+    history = history.sample(min(REPLAY_ROWS, len(history)), random_state=RANDOM_STATE)
+    replay = (history[FEATURE_COLS], history[TARGET_COL].astype(str))
+
+    pipeline = load_pipeline(model_path)
+    start = time.perf_counter()
+    updated = warm_start(pipeline, X, y, replay)
+    seconds = time.perf_counter() - start
+
+    classes = list(pipeline.classes_)
+    for name, model in (("before", pipeline), ("after", updated)):
+        proba = model.predict_proba(X)
+        print(f"{name:>6}: accuracy {accuracy_score(y, model.predict(X)):.4f}, "
+              f"log loss {log_loss(y, proba, labels=classes):.4f} on {len(X)} new records")
+    print(f"Warm start took {seconds:.3f}s")
+
+    save_model(updated, model_path, data_path)
+    state = _read_state(log_dir)
+    state["consumed_labels"] += [os.path.basename(p) for p in label_paths]
+    state["last_refresh"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    with open(_state_path(log_dir), "w") as f:
+        json.dump(state, f, indent=2)
+    print("Model refreshed and saved")
+    return updated
+
+
+def stats(log_dir=LOG_DIR):
+    predictions = segments("predictions", log_dir)
+    labels = segments("labels", log_dir)
+    consumed = set(_read_state(log_dir)["consumed_labels"])
+    return {
+        "prediction_segments": len(predictions),
+        "predictions": int(sum(len(_read_segment(p)) for p in predictions)),
+        "label_segments": len(labels),
+        "pending_label_segments": sum(os.path.basename(p) not in consumed for p in labels),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the prediction log.")
+    parser.add_argument("--log-dir", default=LOG_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    label = commands.add_parser("label", help="add outcomes from a CSV of record_id,loan_status")
+    label.add_argument("labels")
+    refresh_cmd = commands.add_parser("refresh", help="warm-start the model on new labels")
+    refresh_cmd.add_argument("--model", default=None)
+    refresh_cmd.add_argument("--data", default=DATA_PATH)
+    commands.add_parser("compact", help="merge prediction segments into one")
+    commands.add_parser("stats")
+    args = parser.parse_args()
+
+    if args.command == "label":
+        path = add_labels(pd.read_csv(args.labels, skipinitialspace=True), args.log_dir)
+        print(f"Labels written to {path}")
+    elif args.command == "refresh":
+        refresh(args.log_dir, args.model, args.data)
+    elif args.command == "compact":
+        print(f"Compacted {compact(args.log_dir)} segments")
+    else:
+        print(json.dumps(stats(args.log_dir), indent=2))
+
+
+if __name__ == "__main__":
+    main()
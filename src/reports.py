@@ -0,0 +1,244 @@
+# reports.py
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import zip_longest
+
+import numpy as np
+import pandas as pd
+
+REPORT_CACHE_SIZE = int(os.environ.get("LOAN_REPORT_CACHE_SIZE", "64"))
+DEFAULT_CHUNKSIZE = 200
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+
+
+def generate_pdf(dataframe, approved, risk, explanation=None):
+    # explanation is src.explanations.explain() for the applicant; it is
+    # computed with the serving model when not given.
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    from src.explanations import describe, explain
+    if explanation is None:
+        from src.resources import load_model
+        explanation = explain(load_model(), dataframe)
+
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+
+    # Header background
+    c.setFillColorRGB(0.08, 0.72, 0.65)
+    c.rect(0, height - 80, width, 80, fill=1, stroke=0)
+
+    # Title
+    c.setFillColorRGB(1, 1, 1)
+    c.setFont("Helvetica-Bold", 22)
+    c.drawString(50, height - 50, "Loan Prediction Report")
+
+    c.setFillColorRGB(0, 0, 0)
+
+    # Loan Status
+    c.setFont("Helvetica-Bold", 14)
+    status_text = "LOAN APPROVED " if approved else "LOAN REJECTED "
+    c.drawString(50, height - 120, status_text)
+
+    # Risk level
+    c.setFont("Helvetica", 12)
+    c.drawString(50, height - 145, f"Risk Level: {risk}")
+
+    # Divider
+    c.line(50, height - 155, width - 50, height - 155)
+
+    # Applicant Details
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, height - 185, "Applicant Details")
+
+    y = height - 215
+    for col, val in dataframe.iloc[0].items():
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(60, y, f"{col}:")
+        c.setFont("Helvetica", 11)
+        c.drawString(220, y, str(val))
+        y -= 20
+
+    # Positive Factors
+    y -= 15
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, "Positive Factors")
+    y -= 18
+
+    c.setFont("Helvetica", 11)
+    if explanation["positive"]:
+        for driver in explanation["positive"]:
+            c.drawString(60, y, f"- {describe(driver)}")
+            y -= 15
+        y += 15
+    else:
+        c.drawString(60, y, "No strong positive factors identified.")
+
+    # Areas for Improvement
+    y -= 25
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, "Areas for Improvement")
+    y -= 18
+
+    c.setFont("Helvetica", 11)
+    if explanation["negative"]:
+        for driver in explanation["negative"]:
+            c.drawString(60, y, f"- {describe(driver)}")
+            y -= 15
+    else:
+        c.drawString(60, y, "No significant concerns identified.")
+
+    # Footer
+    c.setFont("Helvetica-Oblique", 9)
+    c.setFillColorRGB(0.4, 0.4, 0.4)
+    c.drawString(
+        50,
+        40,
+        "This report is system generated based on the applicant's submitted information."
+    )
+
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+
+def report_key(dataframe, approved, risk, explanation=None):
+    # Applicant inputs plus the decision and drivers printed on the report.
+    inputs = {str(k): v for k, v in dataframe.iloc[0].items()}
+    payload = json.dumps([inputs, bool(approved), str(risk), explanation],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cached_pdf(dataframe, approved, risk, explanation=None):
+    # Bytes of generate_pdf(), memoized so resubmitting the same applicant
+    # (or re-rendering the page) does not rebuild the document.
+    key = report_key(dataframe, approved, risk, explanation)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    # Rendered in the shared worker pool, off the session's thread.
+    from src.worker_pool import render_pdf
+
+    pdf = render_pdf(dataframe, approved, risk, explanation)
+
+    with _lock:
+        _cache[key] = pdf
+        while len(_cache) > REPORT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return pdf
+
+
+def _render_chunk(applications, scores):
+    from src.explanations import explain_rows
+    from src.resources import load_model
+
+    features = applications.drop(columns=["loan_id", "loan_status"], errors="ignore")
+    names = applications["loan_id"] if "loan_id" in applications else applications.index
+    explanations = explain_rows(load_model(), features)
+    reports = []
+    for i, name in enumerate(names):
+        approved = scores["decision"].iloc[i] == "Approved"
+        pdf = generate_pdf(features.iloc[[i]], approved, scores["risk_band"].iloc[i],
+                           explanations[i])
+        reports.append((f"loan_report_{name}.pdf", pdf.getvalue()))
+    return reports
+
+
+def _lines_up(applications, scores):
+    # Same number of rows and, when the scores carry loan_id (batch
+    # scoring copies it over), the same applications in the same order.
+    if applications is None or scores is None or len(applications) != len(scores):
+        return False
+    if "loan_id" in applications and "loan_id" in scores:
+        return np.array_equal(applications["loan_id"].to_numpy(), scores["loan_id"].to_numpy())
+    return True
+
+
+def export_reports(applications_path, scores_path, zip_path,
+                   chunksize=DEFAULT_CHUNKSIZE, workers=None):
+    # applications_path is the CSV that was scored and scores_path the
+    # output of src.batch_scoring for it (same rows, same order). PDFs are
+    # rendered across worker processes and written into the ZIP as each
+    # chunk completes, so only a few chunks of PDFs are ever in memory.
+    from src.data_loading import read_loan_csv
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    count = 0
+    max_pending = 2 * workers
+    pending = deque()
+
+    applications = read_loan_csv(applications_path, chunksize=chunksize)
+    scores = pd.read_csv(scores_path, chunksize=chunksize)
+
+    # Written to a temp file next to zip_path and moved into place once
+    # complete, so a failed export never leaves a truncated archive (or
+    # replaces a good one).
+    directory = os.path.dirname(os.path.abspath(zip_path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(zip_path) + ".", suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as f, \
+                zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as archive, \
+                ProcessPoolExecutor(max_workers=workers) as executor:
+
+            def write(future):
+                nonlocal count
+                for name, pdf in future.result():
+                    archive.writestr(name, pdf)
+                    count += 1
+
+            # zip_longest: a file that ends before the other is an error, not
+            # a shorter archive.
+            rows = 0
+            for app_chunk, score_chunk in zip_longest(applications, scores):
+                if not _lines_up(app_chunk, score_chunk):
+                    raise ValueError(f"{scores_path} does not line up with {applications_path} "
+                                     f"in the {chunksize} rows after row {rows}")
+                rows += len(app_chunk)
+                pending.append(executor.submit(_render_chunk, app_chunk, score_chunk))
+                if len(pending) >= max_pending:
+                    write(pending.popleft())
+            while pending:
+                write(pending.popleft())
+        os.replace(tmp, zip_path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+    return {"reports": count, "seconds": time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render PDF reports for a scored batch into a ZIP.")
+    parser.add_argument("applications", help="CSV of applications that was scored")
+    parser.add_argument("scores", help="output of python -m src.batch_scoring for it")
+    parser.add_argument("output", help="ZIP file to write")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    summary = export_reports(args.applications, args.scores, args.output,
+                             args.chunksize, args.workers)
+    print(f"Wrote {summary['reports']} reports in {summary['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# resources.py
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from src.engines import DEFAULT_ENGINE, check_engine, engine_model_path
+
+DATA_PATH = os.path.join("data", "loan_data.csv")
+# The engine the app and scoring services serve (see src/engines.py).
+MODEL_ENGINE = check_engine(os.environ.get("LOAN_MODEL_ENGINE", DEFAULT_ENGINE))
+MODEL_PATH = engine_model_path(MODEL_ENGINE)
+
+# "auto" serves the NumPy artifact written next to the pickle when it was
+# exported from that same pickle, "pickle" always unpickles the sklearn
+# pipeline, and "artifact" requires the artifact.
+MODEL_FORMAT = os.environ.get("LOAN_MODEL_FORMAT", "auto")
+
+_lock = threading.Lock()
+_entries = {}
+_stats = {}
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _get(name, path, loader):
+    # The stat() call is the only work done on a hit; the file is re-read
+    # (and re-hashed) only when its mtime or size changes on disk.
+    signature = file_signature(path)
+    with _lock:
+        stats = _stats.setdefault(name, {
+            "hits": 0,
+            "misses": 0,
+            "reloads": 0,
+            "load_seconds": None,
+            "loaded_at": None,
+            "version": None,
+        })
+        entry = _entries.get(name)
+        if entry is not None and entry["signature"] == signature:
+            stats["hits"] += 1
+            return entry
+
+        stats["misses"] += 1
+        if entry is not None:
+            stats["reloads"] += 1
+
+        start = time.perf_counter()
+        value = loader(path)
+        entry = {
+            "value": value,
+            "signature": signature,
+            "version": file_hash(path),
+        }
+        stats["load_seconds"] = time.perf_counter() - start
+        stats["loaded_at"] = time.time()
+        stats["version"] = entry["version"]
+        _entries[name] = entry
+        return entry
+
+
+def _read_model(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _read_artifact(manifest_path):
+    from src.model_artifact import load_artifact
+    return load_artifact(manifest_path)
+
+
+def _serving_source(path):
+    # Returns (cache name, file, loader) for the model the app should serve.
+    if MODEL_FORMAT == "pickle":
+        return "model", path, _read_model
+
+    from src.model_artifact import artifact_paths, read_manifest
+    manifest_path, _ = artifact_paths(path)
+    if MODEL_FORMAT == "artifact":
+        return "model", manifest_path, _read_artifact
+    if os.path.exists(manifest_path):
+        manifest = _get("manifest", manifest_path, read_manifest)["value"]
+        if manifest.get("pipeline_sha256") == pipeline_version(path):
+            return "model", manifest_path, _read_artifact
+    return "model", path, _read_model
+
+
+def load_file(name, path, loader):
+    return _get(name, path, loader)["value"]
+
+
+def load_pipeline(path=MODEL_PATH):
+    return _get("pipeline", path, _read_model)["value"]
+
+
+def pipeline_version(path=MODEL_PATH):
+    return _get("pipeline_file", path, lambda p: None)["version"]
+
+
+def load_model(path=MODEL_PATH):
+    return _get(*_serving_source(path))["value"]
+
+
+def _read_dataset(path):
+    from src.data_loading import load_loan_data
+    return load_loan_data(path)
+
+
+def load_dataset(path=DATA_PATH):
+    # A shallow copy: it shares memory with the cached frame, so callers
+    # must not write into it in place. app.py turns on pandas copy-on-write,
+    # which makes such writes copy first.
+    frame = _get("dataset", path, _read_dataset)["value"]
+    return frame.copy(deep=False)
+
+
+def model_version(path=MODEL_PATH):
+    return _get(*_serving_source(path))["version"]
+
+
+def dataset_version(path=DATA_PATH):
+    return _get("dataset", path, _read_dataset)["version"]
+
+
+def cache_stats():
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+
+def clear_cache():
+    with _lock:
+        _entries.clear()
+        _stats.clear()
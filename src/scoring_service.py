@@ -0,0 +1,242 @@
+# scoring_service.py
+
+import argparse
+import json
+import logging
+import numbers
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from src.batch_scoring import score_frame
+from src.data_loading import normalize_frame
+from src.data_preprocessing import FEATURE_COLS, NUMERICAL_COLS
+from src.drift_monitor import update as update_drift
+from src.resources import MODEL_PATH, load_model
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+LATENCY_WINDOW = 10_000
+
+log = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    # Requests that arrive within max_wait_ms of the first queued one are
+    # scored together in a single predict_proba call, which amortizes the
+    # ColumnTransformer's per-call overhead across concurrent callers.
+
+    def __init__(self, model, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self._requests = 0
+        self._batches = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, records):
+        future = Future()
+        self._queue.put((records, future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        items = [self._queue.get()]
+        rows = len(items[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            rows += len(item[0])
+        return items, rows
+
+    def _score(self, items):
+        frame = normalize_frame(pd.DataFrame(
+            [record for records, _, _ in items for record in records]))
+        return frame, score_frame(self.model, frame).to_dict("records")
+
+    def _run(self):
+        while True:
+            items, _ = self._collect()
+            try:
+                frame, scored = self._score(items)
+            except Exception:
+                # One bad request must not fail the others batched with
+                # it: score each on its own so only its caller gets the
+                # error.
+                frames = []
+                for item in items:
+                    try:
+                        frame, scored = self._score([item])
+                    except Exception as exc:
+                        item[1].set_exception(exc)
+                        continue
+                    frames.append(frame)
+                    self._finish([item], scored)
+                if frames:
+                    self._monitor(pd.concat(frames, ignore_index=True))
+                continue
+            self._finish(items, scored)
+            self._monitor(frame)
+
+    def _finish(self, items, scored):
+        offset = 0
+        now = time.perf_counter()
+        for records, future, queued_at in items:
+            future.set_result(scored[offset:offset + len(records)])
+            offset += len(records)
+            with self._stats_lock:
+                self._latencies.append(now - queued_at)
+        with self._stats_lock:
+            self._requests += len(items)
+            self._batches += 1
+            self._batch_sizes.append(offset)
+
+    @staticmethod
+    def _monitor(frame):
+        # Runs on the batcher thread once the results are out; a failure
+        # here must not end the thread, or every later request hangs.
+        try:
+            update_drift(frame)
+        except Exception:
+            log.exception("drift monitoring failed for a batch of %d rows", len(frame))
+
+    def stats(self):
+        with self._stats_lock:
+            latencies = np.array(self._latencies) * 1000
+            batch_sizes = np.array(self._batch_sizes)
+            requests, batches = self._requests, self._batches
+
+        stats = {"requests": requests, "batches": batches}
+        if len(latencies):
+            stats["latency_ms"] = {
+                "p50": float(np.percentile(latencies, 50)),
+                "p99": float(np.percentile(latencies, 99)),
+                "max": float(latencies.max()),
+            }
+            stats["batch_size"] = {
+                "mean": float(batch_sizes.mean()),
+                "p50": float(np.percentile(batch_sizes, 50)),
+                "max": int(batch_sizes.max()),
+            }
+        return stats
+
+
+def parse_records(payload):
+    records = payload if isinstance(payload, list) else [payload]
+    if not records:
+        raise ValueError("expected at least one application")
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f"application {i} is not a JSON object")
+        missing = [col for col in FEATURE_COLS if col not in record]
+        if missing:
+            raise ValueError(f"application {i} is missing {', '.join(missing)}")
+        # JSON numbers only: a string or null would fail the whole batch
+        # it lands in (bool is an int in Python, but not a JSON number).
+        invalid = [col for col in NUMERICAL_COLS
+                   if not isinstance(record[col], numbers.Real) or isinstance(record[col], bool)]
+        if invalid:
+            raise ValueError(f"application {i} has non-numeric {', '.join(invalid)}")
+    return records
+
+
+class ScoringServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 resets connections under bursts.
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def make_handler(batcher, timeout):
+    class ScoringHandler(BaseHTTPRequestHandler):
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/schema":
+                self._send_json(200, {"features": FEATURE_COLS})
+            elif self.path == "/stats":
+                self._send_json(200, batcher.stats())
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                records = parse_records(payload)
+            except ValueError as exc:
+                self._send_json(400, {"error": str(exc)})
+                return
+
+            try:
+                scored = batcher.submit(records).result(timeout=timeout)
+            except Exception as exc:
+                self._send_json(500, {"error": str(exc)})
+                return
+            self._send_json(200, scored if isinstance(payload, list) else scored[0])
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+def serve(host="127.0.0.1", port=8000, model_path=MODEL_PATH,
+          max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+          timeout=10.0):
+    batcher = MicroBatcher(load_model(model_path), max_batch_size, max_wait_ms)
+    server = ScoringServer((host, port), make_handler(batcher, timeout))
+    print(f"Scoring service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve loan scoring over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    serve(args.host, args.port, args.model, args.max_batch_size, args.max_wait_ms, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# startup_profile.py
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+PROFILE_PATH = os.path.join("benchmarks", "startup.json")
+
+# Dependencies that only some pages or actions need. Any of them showing up
+# in a cold start of the home page means an eager import crept back in.
+HEAVY_MODULES = ("sklearn", "scipy", "matplotlib", "seaborn", "reportlab")
+
+# Runs one script run of the app in a fresh interpreter through Streamlit's
+# AppTest, which supplies the session state a bare `python app.py` lacks.
+# Imports made by the harness itself are logged before the marker and left
+# out of the profile.
+_MARKER = "STARTUP_PROFILE_BEGIN"
+_RUNNER = (
+    "import sys, time; sys.path.insert(0, '.'); "
+    "from streamlit.testing.v1 import AppTest; "
+    "print({marker!r}, file=sys.stderr, flush=True); start = time.perf_counter(); "
+    "at = AppTest.from_file({target!r}, default_timeout=300); at.run(); "
+    "print('STARTUP_SECONDS', time.perf_counter() - start); "
+    "sys.exit(1 if at.exception else 0)"
+)
+
+
+def parse_importtime(stderr):
+    # Lines look like "import time:   self [us] |  cumulative | name", with
+    # the name indented two spaces per nesting level.
+    entries = []
+    if _MARKER in stderr:
+        stderr = stderr.split(_MARKER, 1)[1]
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_seconds": int(self_us) / 1e6,
+            "cumulative_seconds": int(cumulative_us) / 1e6,
+        })
+    return entries
+
+
+def run_once(target="app.py"):
+    # Worker processes inherit -X importtime and would mix their imports
+    # into stderr; the pool starts in the background anyway.
+    env = dict(os.environ, PYTHONWARNINGS="ignore", LOAN_WORKERS="0")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _RUNNER.format(marker=_MARKER, target=target)],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    seconds = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("STARTUP_SECONDS"):
+            seconds = float(line.split()[1])
+    return seconds, parse_importtime(proc.stderr)
+
+
+def summarize(entries, top=15):
+    packages = defaultdict(float)
+    for entry in entries:
+        packages[entry["module"].split(".")[0]] += entry["self_seconds"]
+    top_level = sorted((e for e in entries if e["depth"] == 0),
+                       key=lambda e: e["cumulative_seconds"], reverse=True)
+    loaded = {entry["module"].split(".")[0] for entry in entries}
+    return {
+        "import_seconds": sum(e["cumulative_seconds"] for e in entries if e["depth"] == 0),
+        "modules": len(entries),
+        "top_level": top_level[:top],
+        "packages": dict(sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]),
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+
+def profile(target="app.py", repeats=3, top=15):
+    # The median run is reported; the first run also pays for a cold disk
+    # cache, which later runs in the same session do not.
+    runs = [run_once(target) for _ in range(repeats)]
+    seconds = [s for s, _ in runs]
+    median = statistics.median(seconds)
+    _, entries = min(runs, key=lambda run: abs(run[0] - median))
+    return {"target": target, "seconds": median, "runs": seconds, **summarize(entries, top)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the cold start of the Streamlit app.")
+    parser.add_argument("--target", default="app.py")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", default=PROFILE_PATH)
+    args = parser.parse_args()
+
+    report = profile(args.target, args.repeats, args.top)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Cold start of {report['target']}: {report['seconds'] * 1000:.0f} ms "
+          f"({report['import_seconds'] * 1000:.0f} ms in {report['modules']} imports)")
+    print(f"{'cumulative ms':>14}  top-level import")
+    for entry in report["top_level"]:
+        print(f"{entry['cumulative_seconds'] * 1000:14.1f}  {entry['module']}")
+    print(f"{'self ms':>14}  package")
+    for package, seconds in report["packages"].items():
+        print(f"{seconds * 1000:14.1f}  {package}")
+    heavy = ", ".join(report["heavy_modules_loaded"]) or "none"
+    print(f"Heavy modules loaded at startup: {heavy}")
+    print(f"Profile written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# synthetic_data.py
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data_loading import DATA_PATH, TARGET_COL, load_loan_data
+
+DEFAULT_CHUNKSIZE = 500_000
+QUANTILE_LEVELS = np.linspace(0, 1, 201)
+
+# loan_amount and the asset columns are generated as a ratio to income,
+# which carries over the strong income/loan_amount correlation. CIBIL
+# score and loan term are drawn per loan_status, which carries over their
+# relationship with the label.
+RATIO_COLS = [
+    "loan_amount",
+    "residential_assets_value",
+    "commercial_assets_value",
+    "luxury_assets_value",
+    "bank_asset_value",
+]
+STATUS_CONTINUOUS_COLS = ["cibil_score"]
+STATUS_DISCRETE_COLS = ["loan_term"]
+DISCRETE_COLS = ["no_of_dependents", "education", "self_employed"]
+
+COLUMNS = [
+    "loan_id", "no_of_dependents", "education", "self_employed", "income_annum",
+    "loan_amount", "loan_term", "cibil_score", "residential_assets_value",
+    "commercial_assets_value", "luxury_assets_value", "bank_asset_value", TARGET_COL,
+]
+
+
+def _quantiles(values):
+    return np.quantile(np.asarray(values, dtype=np.float64), QUANTILE_LEVELS).tolist()
+
+
+def _pmf(series):
+    counts = series.astype(object).value_counts(normalize=True).sort_index()
+    return {"values": counts.index.tolist(), "p": counts.to_numpy().tolist()}
+
+
+def _step(values):
+    # Granularity the source uses (e.g. incomes in steps of 100000).
+    values = np.abs(np.asarray(values, dtype=np.int64))
+    values = values[values > 0]
+    return int(np.gcd.reduce(values)) if len(values) else 1
+
+
+def learn_profile(frame):
+    income = frame["income_annum"].to_numpy(dtype=np.float64)
+    statuses = sorted(frame[TARGET_COL].astype(str).unique())
+    by_status = {status: frame[frame[TARGET_COL].astype(str) == status] for status in statuses}
+    steps = {col: _step(frame[col]) for col in ["income_annum"] + RATIO_COLS + STATUS_CONTINUOUS_COLS}
+
+    return {
+        "status": _pmf(frame[TARGET_COL]),
+        "income_annum": _quantiles(income),
+        "ratios": {
+            col: _quantiles(frame[col].to_numpy(dtype=np.float64) / np.maximum(income, 1))
+            for col in RATIO_COLS
+        },
+        "by_status": {
+            status: {
+                **{col: _quantiles(part[col]) for col in STATUS_CONTINUOUS_COLS},
+                **{col: _pmf(part[col]) for col in STATUS_DISCRETE_COLS},
+            }
+            for status, part in by_status.items()
+        },
+        "discrete": {col: _pmf(frame[col]) for col in DISCRETE_COLS},
+        "steps": steps,
+    }
+
+
+def _from_quantiles(rng, quantiles, n):
+    return np.interp(rng.random(n), QUANTILE_LEVELS, quantiles)
+
+
+def _choice(rng, pmf, n):
+    values = np.asarray(pmf["values"], dtype=object)
+    return values[rng.choice(len(values), size=n, p=pmf["p"])]
+
+
+def _round_to(values, step):
+    return (np.round(values / step) * step).astype(np.int64)
+
+
+def generate_chunk(profile, seed, chunk_index, start_id, n_rows):
+    # Each chunk has its own stream derived from (seed, chunk_index), so
+    # the output is identical for any number of workers.
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+    steps = profile["steps"]
+
+    status = _choice(rng, profile["status"], n_rows)
+    income = _round_to(_from_quantiles(rng, profile["income_annum"], n_rows), steps["income_annum"])
+    income = np.maximum(income, steps["income_annum"])
+
+    data = {
+        "loan_id": np.arange(start_id, start_id + n_rows, dtype=np.int64),
+        "income_annum": income,
+    }
+    for col in DISCRETE_COLS:
+        data[col] = _choice(rng, profile["discrete"][col], n_rows)
+    for col in RATIO_COLS:
+        ratio = _from_quantiles(rng, profile["ratios"][col], n_rows)
+        data[col] = _round_to(income * ratio, steps[col])
+
+    for col in STATUS_CONTINUOUS_COLS + STATUS_DISCRETE_COLS:
+        data[col] = np.empty(n_rows, dtype=np.int64)
+    for value, part in profile["by_status"].items():
+        mask = status == value
+        n = int(mask.sum())
+        for col in STATUS_CONTINUOUS_COLS:
+            data[col][mask] = _round_to(_from_quantiles(rng, part[col], n), steps[col])
+        for col in STATUS_DISCRETE_COLS:
+            data[col][mask] = _choice(rng, part[col], n).astype(np.int64)
+    data[TARGET_COL] = status
+
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def _write_csv(output_path):
+    header = [True]
+
+    def write(chunk):
+        chunk.to_csv(output_path, mode="w" if header[0] else "a", header=header[0], index=False)
+        header[0] = False
+
+    return write, lambda: None
+
+
+def _write_parquet(output_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = [None]
+
+    def write(chunk):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer[0] is None:
+            writer[0] = pq.ParquetWriter(output_path, table.schema)
+        writer[0].write_table(table)
+
+    def close():
+        if writer[0] is not None:
+            writer[0].close()
+
+    return write, close
+
+
+def generate(output_path, n_rows, seed=0, source_path=DATA_PATH,
+             chunksize=DEFAULT_CHUNKSIZE, workers=None):
+    # Streams chunks to CSV or Parquet (by extension) in order, with at
+    # most two chunks per worker in memory.
+    workers = workers or os.cpu_count() or 1
+    profile = learn_profile(load_loan_data(source_path))
+    write, close = (_write_parquet if output_path.endswith(".parquet") else _write_csv)(output_path)
+
+    start = time.perf_counter()
+    starts = range(0, n_rows, chunksize)
+    jobs = ((i, first + 1, min(chunksize, n_rows - first)) for i, first in enumerate(starts))
+    try:
+        if workers == 1:
+            for i, first_id, size in jobs:
+                write(generate_chunk(profile, seed, i, first_id, size))
+        else:
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for i, first_id, size in jobs:
+                    pending.append(executor.submit(generate_chunk, profile, seed, i, first_id, size))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        close()
+    return {"rows": n_rows, "seconds": time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic loan dataset.")
+    parser.add_argument("output", help="CSV or .parquet file to write")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", default=DATA_PATH, help="dataset to learn distributions from")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    summary = generate(args.output, args.rows, args.seed, args.source, args.chunksize, args.workers)
+    print(f"Wrote {summary['rows']} rows in {summary['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
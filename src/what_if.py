@@ -0,0 +1,83 @@
+# what_if.py
+
+import numpy as np
+import pandas as pd
+
+from src.batch_scoring import score_frame
+from src.decision_rules import APPROVAL_THRESHOLD
+
+SWEEP_FEATURES = ["loan_amount", "loan_term", "cibil_score"]
+DEFAULT_POINTS = {1: 60, 2: 40}
+
+
+def default_range(feature, value, snapshot):
+    # The span seen in the data, stretched to include the applicant. The
+    # outer edges of the dashboard snapshot's histogram are the column's
+    # min and max, so no rows are scanned.
+    edges = snapshot["histograms"][feature]["edges"]
+    if not edges:
+        return value, value
+    return min(edges[0], value), max(edges[-1], value)
+
+
+def grid_values(feature, low, high, points):
+    values = np.linspace(low, high, points)
+    if feature != "loan_amount":
+        values = np.unique(np.round(values))
+    return values
+
+
+def sweep(model, features, axes):
+    # features: the submitted applicant; axes: {feature: grid values} for
+    # one or two features. Every grid point is an applicant that differs
+    # only in the swept features, and the whole grid is scored in one
+    # batched call with the form's decision rules.
+    names = list(axes)
+    if not 1 <= len(names) <= 2:
+        raise ValueError("sweep one or two features")
+    mesh = np.meshgrid(*(np.asarray(axes[name], dtype=np.float64) for name in names),
+                       indexing="ij")
+    n_points = mesh[0].size
+
+    grid = pd.DataFrame({col: np.repeat(value, n_points) for col, value in features.items()})
+    for name, values in zip(names, mesh):
+        grid[name] = values.ravel()
+    scored = score_frame(model, grid)
+
+    shape = mesh[0].shape
+    return {
+        "features": names,
+        "axes": [np.asarray(axes[name], dtype=np.float64).tolist() for name in names],
+        "probability": scored["approval_probability"].to_numpy().reshape(shape),
+        "approved": (scored["decision"] == "Approved").to_numpy().reshape(shape),
+    }
+
+
+def _crossings(values, probability, approved):
+    # Points along one axis where the decision flips, placed where the
+    # probability crosses the approval threshold when it does so between
+    # the two grid points.
+    crossings = []
+    for i in np.flatnonzero(approved[1:] != approved[:-1]):
+        low, high = values[i], values[i + 1]
+        p_low, p_high = probability[i], probability[i + 1]
+        at = high
+        if (p_low - APPROVAL_THRESHOLD) * (p_high - APPROVAL_THRESHOLD) <= 0 and p_low != p_high:
+            at = low + (APPROVAL_THRESHOLD - p_low) / (p_high - p_low) * (high - low)
+        crossings.append({"value": float(at), "becomes_approved": bool(approved[i + 1])})
+    return crossings
+
+
+def decision_boundary(result):
+    # 1-D: the crossings along the swept feature. 2-D: for each value of
+    # the second feature, the crossings along the first.
+    x = np.asarray(result["axes"][0])
+    probability, approved = result["probability"], result["approved"]
+    if len(result["features"]) == 1:
+        return _crossings(x, probability, approved)
+
+    boundary = []
+    for j, y in enumerate(result["axes"][1]):
+        for crossing in _crossings(x, probability[:, j], approved[:, j]):
+            boundary.append({result["features"][1]: float(y), **crossing})
+    return boundary
@@ -0,0 +1,230 @@
+# worker_pool.py
+
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import context, popen_spawn_posix, resource_tracker, spawn, util
+
+from src.resources import MODEL_PATH
+
+# One pool per server process, shared by every Streamlit session. Below
+# two workers everything runs inline on the calling thread, since a
+# single worker process would only add pickling to each request.
+WORKERS = int(os.environ.get("LOAN_WORKERS", str(os.cpu_count() or 1)))
+# Requests admitted but not finished, across all sessions. Past this a
+# request waits up to LOAN_WORKER_QUEUE_TIMEOUT for a slot and is then
+# turned away rather than queued without bound.
+MAX_PENDING = int(os.environ.get("LOAN_WORKER_QUEUE", str(4 * max(WORKERS, 1))))
+QUEUE_TIMEOUT = float(os.environ.get("LOAN_WORKER_QUEUE_TIMEOUT", "5"))
+REQUEST_TIMEOUT = float(os.environ.get("LOAN_WORKER_TIMEOUT", "30"))
+
+
+class PoolBusy(RuntimeError):
+    # The request was not run, or its worker died: safe to retry.
+    pass
+
+
+_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_PENDING)
+_pool = None
+_started = False
+_stats = {"submitted": 0, "rejected": 0, "timeouts": 0, "restarts": 0}
+
+
+class _WorkerPopen(popen_spawn_posix.Popen):
+    # The stock spawn launch, except that the child is not told to import
+    # the parent's __main__ first. Under Streamlit that is app.py, and
+    # every worker would run the whole app; the workers only need this
+    # module, which they import by name to unpickle their tasks.
+    def _launch(self, process_obj):
+        tracker_fd = resource_tracker.getfd()
+        self._fds.append(tracker_fd)
+        prep_data = spawn.get_preparation_data(process_obj._name)
+        prep_data.pop("init_main_from_path", None)
+        prep_data.pop("init_main_from_name", None)
+        fp = io.BytesIO()
+        context.set_spawning_popen(self)
+        try:
+            context.reduction.dump(prep_data, fp)
+            context.reduction.dump(process_obj, fp)
+        finally:
+            context.set_spawning_popen(None)
+
+        parent_r = child_w = child_r = parent_w = None
+        try:
+            parent_r, child_w = os.pipe()
+            child_r, parent_w = os.pipe()
+            cmd = spawn.get_command_line(tracker_fd=tracker_fd, pipe_handle=child_r)
+            self._fds.extend([child_r, child_w])
+            self.pid = util.spawnv_passfds(spawn.get_executable(), cmd, self._fds)
+            self.sentinel = parent_r
+            with open(parent_w, "wb", closefd=False) as f:
+                f.write(fp.getbuffer())
+        finally:
+            self.finalizer = util.Finalize(self, util.close_fds,
+                                           [fd for fd in (parent_r, parent_w) if fd is not None])
+            for fd in (child_r, child_w):
+                if fd is not None:
+                    os.close(fd)
+
+
+class _WorkerProcess(context.SpawnProcess):
+    @staticmethod
+    def _Popen(process_obj):
+        return _WorkerPopen(process_obj)
+
+
+class _WorkerContext(context.SpawnContext):
+    # spawn, not fork: the Streamlit server is multithreaded, and a forked
+    # child could inherit a lock held by another thread.
+    Process = _WorkerProcess
+
+
+def _init_worker(model_path):
+    # Loaded once per worker; later tasks hit the resources cache, which
+    # still picks up a replaced model file.
+    from src.resources import load_model
+
+    load_model(model_path)
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=WORKERS,
+                mp_context=_WorkerContext(),
+                initializer=_init_worker,
+                initargs=(MODEL_PATH,),
+            )
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+            _stats["restarts"] += 1
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def start():
+    # Starts every worker in the background so the first requests do not
+    # wait for a worker to import pandas and load the model. Only the
+    # first call per process does anything.
+    global _started
+    with _lock:
+        if _started or WORKERS < 2:
+            return
+        _started = True
+    pool = _get_pool()
+    for _ in range(WORKERS):
+        pool.submit(time.sleep, 0)
+
+
+def run(fn, *args, timeout=None):
+    # Runs fn(*args) in a worker (fn must be importable by name) and
+    # returns its result. Raises PoolBusy when no slot frees up within
+    # QUEUE_TIMEOUT and TimeoutError when the result takes longer than
+    # timeout (REQUEST_TIMEOUT by default).
+    if not _slots.acquire(timeout=QUEUE_TIMEOUT):
+        with _lock:
+            _stats["rejected"] += 1
+        raise PoolBusy(f"{MAX_PENDING} requests already in progress")
+    with _lock:
+        _stats["submitted"] += 1
+
+    if WORKERS < 2:
+        try:
+            return fn(*args)
+        finally:
+            _slots.release()
+
+    pool = _get_pool()
+    try:
+        future = pool.submit(fn, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool once.
+        _discard_pool(pool)
+        try:
+            future = _get_pool().submit(fn, *args)
+        except BaseException:
+            _slots.release()
+            raise
+    except BaseException:
+        _slots.release()
+        raise
+    # The slot is held until the work is actually done or cancelled, so
+    # a timed-out request still counts against MAX_PENDING while it runs.
+    future.add_done_callback(lambda _: _slots.release())
+
+    timeout = REQUEST_TIMEOUT if timeout is None else timeout
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        with _lock:
+            _stats["timeouts"] += 1
+        raise TimeoutError(f"no result within {timeout:g}s") from None
+    except BrokenProcessPool:
+        # Every request in flight on the dead pool ends up here; the
+        # caller can retry on the fresh one.
+        _discard_pool(pool)
+        raise PoolBusy("a worker process stopped while handling the request") from None
+
+
+def pool_stats():
+    with _lock:
+        return dict(_stats, workers=WORKERS if WORKERS >= 2 else 0, max_pending=MAX_PENDING)
+
+
+def _score_task(features, model_path=MODEL_PATH):
+    # The form's scoring stages. Stage timings are returned rather than
+    # recorded, since metrics live in the server process.
+    import pandas as pd
+
+    from src.data_preprocessing import FEATURE_COLS
+    from src.explanations import explain
+    from src.resources import load_model
+
+    model = load_model(model_path)
+    timings = {}
+    start = time.perf_counter()
+    input_df = pd.DataFrame([features])
+    timings["build_input_df"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    input_df = input_df.reindex(columns=getattr(model, "feature_names_in_", FEATURE_COLS),
+                                fill_value=0)
+    timings["reindex"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    proba = model.predict_proba(input_df)[0]
+    timings["predict_proba"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    explanation = explain(model, input_df)
+    timings["explain"] = time.perf_counter() - start
+    return input_df, proba, explanation, timings
+
+
+def _pdf_task(dataframe, approved, risk, explanation):
+    from src.reports import generate_pdf
+
+    return generate_pdf(dataframe, approved, risk, explanation).getvalue()
+
+
+def score(features):
+    # (input_df, probabilities, explanation, stage timings) for one
+    # applicant from the form.
+    return run(_score_task, features)
+
+
+def render_pdf(dataframe, approved, risk, explanation=None):
+    return run(_pdf_task, dataframe, approved, risk, explanation)
@@ -0,0 +1,14 @@
+# conftest.py
+
+import os
+import sys
+
+# The modules read data/ and models/ by relative path, as the app does
+# when started from the repository root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+# Tests must not add records to the runtime decision log or drift window.
+os.environ.setdefault("LOAN_PREDICTION_LOG_DIR", "")
+os.environ.setdefault("LOAN_DRIFT_DIR", "")
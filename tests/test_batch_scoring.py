@@ -0,0 +1,30 @@
+# test_batch_scoring.py
+
+import numpy as np
+
+from src.batch_scoring import score_frame
+from src.data_preprocessing import FEATURE_COLS
+from src.decision_rules import apply_decision_rules, approved_class_index
+from src.resources import load_dataset, load_model
+from src.worker_pool import _score_task
+
+
+def test_form_and_batch_make_the_same_decisions():
+    model = load_model()
+    frame = load_dataset()[FEATURE_COLS].sample(200, random_state=0)
+    batch = score_frame(model, frame)
+
+    form = []
+    for features in frame.to_dict("records"):
+        # As the form builds them: the selectbox labels and plain numbers
+        _, proba, _, _ = _score_task(features)
+        form.append(apply_decision_rules(proba[approved_class_index(model)] * 100,
+                                         features["income_annum"],
+                                         features["no_of_dependents"],
+                                         features["loan_amount"]))
+    probability, approved, risk = (np.array(values) for values in zip(*form))
+
+    # Equal up to summation order in the one-row vs many-row matrix product
+    np.testing.assert_allclose(probability, batch["approval_probability"], rtol=0, atol=1e-9)
+    np.testing.assert_array_equal(np.where(approved, "Approved", "Rejected"), batch["decision"])
+    np.testing.assert_array_equal(risk.astype(str), batch["risk_band"].to_numpy(dtype=str))
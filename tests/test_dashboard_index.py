@@ -0,0 +1,39 @@
+# test_dashboard_index.py
+
+import numpy as np
+import pytest
+
+from src.dashboard_index import DashboardIndex, build_index
+from src.resources import load_dataset
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return load_dataset()
+
+
+@pytest.fixture(scope="module")
+def index(frame):
+    return DashboardIndex(build_index(frame))
+
+
+@pytest.mark.parametrize("ranges, categories", [
+    ({}, {}),
+    ({"cibil_score": (600, 900)}, {}),
+    ({"cibil_score": (300, 450), "loan_amount": (0, 10_000_000)}, {"education": ["Graduate"]}),
+    ({"loan_amount": (5_000_000, 20_000_000)}, {"self_employed": ["Yes"], "education": ["Not Graduate"]}),
+    ({"cibil_score": (1000, 2000)}, {}),
+])
+def test_query_matches_pandas(frame, index, ranges, categories):
+    keep = np.ones(len(frame), dtype=bool)
+    for col, (low, high) in ranges.items():
+        keep &= frame[col].between(low, high).to_numpy()
+    for col, allowed in categories.items():
+        keep &= frame[col].isin(allowed).to_numpy()
+    rows = frame[keep]
+
+    summary = index.query(ranges, categories)
+    assert summary["total"] == len(rows)
+    assert summary["approved"] == int((rows["loan_status"] == "Approved").sum())
+    counts, _ = np.histogram(rows["income_annum"], bins=np.asarray(summary["histogram"]["edges"]))
+    assert summary["histogram"]["counts"] == counts.tolist()
@@ -0,0 +1,48 @@
+# test_data_loading.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.batch_scoring import score_csv
+from src.data_loading import read_loan_csv
+
+SOURCE = "data/loan_data.csv"
+
+
+@pytest.fixture
+def blank_csv(tmp_path):
+    # The first rows of loan_data.csv with two numeric cells left blank
+    # and one decimal, written the way the original file is formatted.
+    lines = open(SOURCE).read().splitlines()[:101]
+    header = [c.strip() for c in lines[0].split(",")]
+    rows = [line.split(",") for line in lines[1:]]
+    rows[3][header.index("cibil_score")] = ""
+    rows[7][header.index("income_annum")] = " "
+    rows[9][header.index("loan_term")] = " 12.5"
+    path = tmp_path / "blank.csv"
+    path.write_text("\n".join([lines[0], *(",".join(r) for r in rows)]) + "\n")
+    return path
+
+
+def test_blank_numeric_cells_are_missing(blank_csv):
+    frame = read_loan_csv(blank_csv)
+    assert np.isnan(frame["cibil_score"].iloc[3])
+    assert np.isnan(frame["income_annum"].iloc[7])
+    assert frame["loan_term"].iloc[9] == 12.5
+    assert frame["no_of_dependents"].dtype == np.int32
+    assert frame["cibil_score"].dtype == np.float64
+
+
+def test_chunks_match_whole_file(blank_csv):
+    chunks = pd.concat(read_loan_csv(blank_csv, chunksize=16), ignore_index=True)
+    whole = read_loan_csv(blank_csv)
+    pd.testing.assert_frame_equal(chunks.astype(whole.dtypes.to_dict()), whole)
+
+
+def test_batch_scoring_imputes_blank_cells(blank_csv, tmp_path):
+    output = tmp_path / "scored.csv"
+    score_csv(str(blank_csv), str(output), chunksize=16, workers=1, monitor_drift=False)
+    scored = pd.read_csv(output)
+    assert len(scored) == 100
+    assert scored["approval_probability"].notna().all()
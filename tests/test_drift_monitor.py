@@ -0,0 +1,81 @@
+# test_drift_monitor.py
+
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from src import drift_monitor
+from src.data_preprocessing import FEATURE_COLS
+from src.resources import load_dataset
+
+
+@pytest.fixture
+def window(tmp_path, monkeypatch):
+    # An empty monitoring window writing to tmp_path.
+    monkeypatch.setattr(drift_monitor, "DRIFT_DIR", str(tmp_path))
+    monkeypatch.setattr(drift_monitor, "_live", None)
+    return tmp_path
+
+
+def _form_features(frame):
+    # Rows as the Loan Prediction form sends them.
+    return frame[FEATURE_COLS].astype(object).to_dict("records")
+
+
+def _statuses():
+    return {row["feature"]: row["status"] for row in drift_monitor.drift_report()["features"]}
+
+
+def test_form_rows_from_the_training_data_are_stable(window):
+    sample = load_dataset().sample(300, random_state=0)
+    for features in _form_features(sample):
+        drift_monitor.update(features)
+    assert set(_statuses().values()) == {"stable"}
+
+
+def test_shifted_feature_is_significant(window):
+    sample = load_dataset().sample(300, random_state=0)
+    sample = sample.assign(cibil_score=np.minimum(sample["cibil_score"] + 250, 900))
+    drift_monitor.update(sample)
+    statuses = _statuses()
+    assert statuses["cibil_score"] == "significant"
+    assert statuses["income_annum"] == "stable"
+
+
+def test_concurrent_flushes(window, monkeypatch):
+    monkeypatch.setattr(drift_monitor, "FLUSH_SECONDS", 0)
+    rows = _form_features(load_dataset().head(100))
+    errors = []
+
+    def submit():
+        try:
+            for features in rows:
+                drift_monitor.update(features)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert [p.name for p in window.iterdir()] == [drift_monitor._sketch_file]
+    assert drift_monitor.live_sketch()["rows"] == 800
+
+
+def test_sketches_against_another_reference_are_left_out(window):
+    sample = load_dataset().sample(300, random_state=0)
+    drift_monitor.update(sample)
+    drift_monitor.flush()
+    reference = drift_monitor.load_reference()
+    stale = dict(drift_monitor.empty_sketch(reference), reference="0" * 64, rows=500)
+    (window / "live-0-stale.json").write_text(json.dumps(stale))
+    assert drift_monitor.live_sketch()["rows"] == 300
+
+    # This process's own window restarts once the training data changes.
+    drift_monitor._live["reference"] = "0" * 64
+    drift_monitor.update(sample.head(10))
+    assert drift_monitor.live_sketch()["rows"] == 10
@@ -0,0 +1,51 @@
+# test_evaluation.py
+
+import json
+
+import numpy as np
+import pytest
+from sklearn.metrics import precision_score, recall_score, roc_auc_score
+
+from src.evaluation import at_thresholds, calibration_bins, roc_auc, threshold_sweep
+
+
+@pytest.fixture
+def scored():
+    rng = np.random.default_rng(0)
+    y = rng.random(2000) < 0.6
+    # Rounded so that many scores tie, which the sweep has to group.
+    scores = np.round(np.clip(0.3 * y + rng.random(2000) * 0.7, 0, 1), 2)
+    return y, scores
+
+
+def test_roc_auc_matches_sklearn(scored):
+    y, scores = scored
+    assert roc_auc(threshold_sweep(y, scores)) == pytest.approx(roc_auc_score(y, scores), abs=1e-12)
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.255, 0.5, 0.7, 0.99, 1.5])
+def test_at_thresholds_matches_rescoring(scored, threshold):
+    y, scores = scored
+    at = at_thresholds(threshold_sweep(y, scores), threshold)
+    predicted = scores >= threshold
+    assert at["recall"][0] == pytest.approx(recall_score(y, predicted))
+    assert at["precision"][0] == pytest.approx(precision_score(y, predicted, zero_division=1))
+    assert at["accuracy"][0] == pytest.approx(np.mean(predicted == y))
+
+
+def test_calibration_bins_cover_every_row(scored):
+    y, scores = scored
+    bins = calibration_bins(y, scores)
+    assert sum(bins["count"]) == len(y)
+    assert 0 <= bins["ece"] <= 1
+
+
+def test_decisions_and_report_share_the_threshold():
+    from src.decision_rules import apply_decision_rules
+    from src.evaluation import DECISION_THRESHOLD, evaluation_path
+    from src.resources import MODEL_PATH
+
+    approved = apply_decision_rules([69.9, 70.0], 100_000, 0, 100_000)[1]
+    assert approved.tolist() == [False, True]
+    with open(evaluation_path(MODEL_PATH)) as f:
+        assert json.load(f)["decision_threshold"] == DECISION_THRESHOLD == 0.70
@@ -0,0 +1,19 @@
+# test_explanations.py
+
+import numpy as np
+
+from src.data_preprocessing import CATEGORICAL_COLS, FEATURE_COLS
+from src.decision_rules import approved_class_index
+from src.explanations import approval_contributions, explain_rows
+from src.resources import load_dataset, load_model
+
+
+def test_contributions_add_up_to_the_approval_log_odds():
+    model = load_model()
+    frame = load_dataset()[FEATURE_COLS].head(500)
+    reference, terms, names = approval_contributions(model, frame)
+    approved = model.predict_proba(frame)[:, approved_class_index(model)]
+    np.testing.assert_allclose(reference + terms.sum(axis=1), np.log(approved / (1 - approved)),
+                               rtol=0, atol=1e-9)
+    drivers = [d["feature"] for e in explain_rows(model, frame) for d in e["positive"] + e["negative"]]
+    assert set(drivers) & set(CATEGORICAL_COLS)
@@ -0,0 +1,69 @@
+# test_fast_scorer.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing import FEATURE_COLS
+from src.fast_scorer import Float32Scorer, export_scorer, max_probability_difference
+from src.model_artifact import artifact_paths, load_artifact
+from src.resources import MODEL_PATH, load_dataset, load_pipeline
+
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return load_pipeline()
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return load_dataset()[FEATURE_COLS]
+
+
+def test_exported_scorer_matches_pipeline(pipeline, frame):
+    assert max_probability_difference(pipeline, export_scorer(pipeline), frame) < TOLERANCE
+
+
+def test_artifact_scorer_matches_pipeline(pipeline, frame):
+    manifest_path, _ = artifact_paths(MODEL_PATH)
+    assert max_probability_difference(pipeline, load_artifact(manifest_path), frame) < TOLERANCE
+
+
+def test_saved_artifact_round_trips(pipeline, frame, tmp_path):
+    from src.model_artifact import save_artifact
+
+    model_path = tmp_path / "loan_model.pkl"
+    model_path.write_bytes(open(MODEL_PATH, "rb").read())
+    manifest_path = save_artifact(pipeline, str(model_path), "data/loan_data.csv")
+    assert max_probability_difference(pipeline, load_artifact(manifest_path), frame) < TOLERANCE
+
+
+def test_missing_and_unknown_values_match_pipeline(pipeline, frame):
+    rows = frame.head(4).astype(object)
+    rows.iloc[0, rows.columns.get_loc("cibil_score")] = np.nan
+    rows.iloc[1, rows.columns.get_loc("income_annum")] = None
+    rows.iloc[2, rows.columns.get_loc("education")] = None
+    rows.iloc[3, rows.columns.get_loc("self_employed")] = "Unknown"
+    assert max_probability_difference(pipeline, export_scorer(pipeline), rows) < TOLERANCE
+
+
+def test_input_forms_agree(pipeline, frame):
+    scorer = export_scorer(pipeline)
+    rows = frame.head(50)
+    expected = scorer.predict_proba(rows)
+    records = [{k: (v.item() if hasattr(v, "item") else v) for k, v in r.items()}
+               for r in rows.astype(object).to_dict("records")]
+    np.testing.assert_allclose(scorer.predict_proba(records), expected, rtol=0, atol=TOLERANCE)
+    np.testing.assert_allclose(scorer.predict_proba(records[0]), expected[:1], rtol=0, atol=TOLERANCE)
+    plain = pd.DataFrame(rows.astype(object).to_numpy(), columns=rows.columns)
+    np.testing.assert_allclose(scorer.predict_proba(plain), expected, rtol=0, atol=TOLERANCE)
+
+
+def test_float32_scorer_close_to_float64(pipeline, frame):
+    scorer = export_scorer(pipeline)
+    expected = scorer.predict_proba(frame)[:, 1]
+    actual = Float32Scorer(scorer).positive_probability(frame)
+    assert actual.dtype == np.float32
+    assert np.max(np.abs(actual - expected)) < 1e-5
@@ -0,0 +1,15 @@
+# test_instrumentation.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.instrumentation import export_metrics, record
+
+
+def test_concurrent_exports(tmp_path):
+    path = str(tmp_path / "prediction.prom")
+    record("predict_proba", 0.002)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: export_metrics(path), range(400)))
+    assert os.listdir(tmp_path) == ["prediction.prom"]
+    assert 'stage="predict_proba"' in open(path).read()
@@ -0,0 +1,48 @@
+# test_model_training.py
+
+import os
+
+import numpy as np
+import pytest
+from sklearn.metrics import classification_report, confusion_matrix
+
+from src.evaluation import evaluation_path
+from src.model_training import _Reservoir, confusion_report, save_model
+from src.resources import load_pipeline
+
+
+def test_confusion_report_matches_sklearn():
+    rng = np.random.default_rng(0)
+    classes = np.array(["Approved", "Rejected"])
+    y_true = classes[(rng.random(1000) < 0.4).astype(int)]
+    y_pred = np.where(rng.random(1000) < 0.8, y_true, classes[::-1][(y_true == "Rejected").astype(int)])
+    confusion = confusion_matrix(y_true, y_pred, labels=classes)
+    assert confusion_report(confusion, classes).split() == classification_report(y_true, y_pred).split()
+
+
+def test_reservoir_is_exact_until_full():
+    values = np.random.default_rng(1).integers(0, 1000, 5000).astype(np.float64)
+    sample = _Reservoir(10_000, np.random.default_rng(0))
+    for chunk in np.array_split(values, 7):
+        sample.add(chunk)
+    assert sample.median() == np.median(values)
+
+
+def test_reservoir_median_is_bounded_and_close():
+    values = np.random.default_rng(2).lognormal(15, 1, 200_000)
+    sample = _Reservoir(5_000, np.random.default_rng(0))
+    for chunk in np.array_split(values, 40):
+        sample.add(chunk)
+    assert len(sample.values) == 5_000
+    assert np.mean(values <= sample.median()) == pytest.approx(0.5, abs=0.03)
+
+
+def test_saving_a_model_removes_its_stale_evaluation_report(tmp_path):
+    model = load_pipeline()
+    model_path = str(tmp_path / "loan_model.pkl")
+    report_path = evaluation_path(model_path)
+    with open(report_path, "w") as f:
+        f.write("{}")
+    save_model(model, model_path)
+    assert os.path.exists(model_path)
+    assert not os.path.exists(report_path)
@@ -0,0 +1,55 @@
+# test_reports.py
+
+import zipfile
+
+import pandas as pd
+import pytest
+
+from src.batch_scoring import score_csv
+from src.reports import export_reports
+
+
+@pytest.fixture
+def scored(tmp_path):
+    applications = tmp_path / "applications.csv"
+    lines = open("data/loan_data.csv").read().splitlines()[:41]
+    applications.write_text("\n".join(lines) + "\n")
+    scores = tmp_path / "scores.csv"
+    score_csv(str(applications), str(scores), chunksize=10, workers=1, monitor_drift=False)
+    return applications, scores
+
+
+def test_exports_one_report_per_application(scored, tmp_path):
+    applications, scores = scored
+    archive = tmp_path / "reports.zip"
+    assert export_reports(applications, scores, archive, chunksize=10, workers=1)["reports"] == 40
+    with zipfile.ZipFile(archive) as z:
+        assert len(z.namelist()) == 40
+
+
+@pytest.mark.parametrize("rows", [20, 25])
+def test_short_scores_file_is_an_error(scored, tmp_path, rows):
+    applications, scores = scored
+    pd.read_csv(scores).head(rows).to_csv(scores, index=False)
+    with pytest.raises(ValueError, match="does not line up"):
+        export_reports(applications, scores, tmp_path / "reports.zip", chunksize=10, workers=1)
+
+
+def test_reordered_scores_are_an_error(scored, tmp_path):
+    applications, scores = scored
+    frame = pd.read_csv(scores)
+    frame.iloc[10:20] = frame.iloc[10:20].iloc[::-1].to_numpy()
+    frame.to_csv(scores, index=False)
+    with pytest.raises(ValueError, match="does not line up"):
+        export_reports(applications, scores, tmp_path / "reports.zip", chunksize=10, workers=1)
+
+
+def test_failed_export_leaves_no_archive(scored, tmp_path):
+    applications, scores = scored
+    pd.read_csv(scores).head(25).to_csv(scores, index=False)
+    archive = tmp_path / "reports.zip"
+    before = set(tmp_path.iterdir())
+    with pytest.raises(ValueError, match="does not line up"):
+        export_reports(applications, scores, archive, chunksize=10, workers=1)
+    assert not archive.exists()
+    assert set(tmp_path.iterdir()) == before
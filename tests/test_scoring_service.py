@@ -0,0 +1,45 @@
+# test_scoring_service.py
+
+import pytest
+
+from src import scoring_service
+from src.data_preprocessing import FEATURE_COLS
+from src.resources import load_dataset, load_model
+from src.scoring_service import MicroBatcher, parse_records
+
+
+@pytest.fixture(scope="module")
+def record():
+    row = load_dataset()[FEATURE_COLS].iloc[0].to_dict()
+    return {k: (v.item() if hasattr(v, "item") else v) for k, v in row.items()}
+
+
+@pytest.mark.parametrize("value", ["abc", None, True, [1]])
+def test_parse_records_rejects_non_numeric(record, value):
+    with pytest.raises(ValueError, match="non-numeric income_annum"):
+        parse_records(dict(record, income_annum=value))
+
+
+def test_parse_records_accepts_numbers(record):
+    assert len(parse_records([record, dict(record, income_annum=1.5e6)])) == 2
+
+
+def test_bad_request_does_not_fail_its_batch(record):
+    # A long wait puts both requests in the same batch.
+    batcher = MicroBatcher(load_model(), max_wait_ms=200)
+    good = batcher.submit([record])
+    bad = batcher.submit([dict(record, income_annum="abc")])
+    assert good.result(timeout=10)[0]["decision"] in ("Approved", "Rejected")
+    with pytest.raises(ValueError):
+        bad.result(timeout=10)
+    assert batcher.stats()["requests"] == 1
+
+
+def test_drift_failure_does_not_stop_the_batcher(record, monkeypatch):
+    def fail(frame):
+        raise FileNotFoundError("data/loan_data.csv")
+
+    monkeypatch.setattr(scoring_service, "update_drift", fail)
+    batcher = MicroBatcher(load_model(), max_wait_ms=1)
+    for _ in range(3):
+        assert len(batcher.submit([record]).result(timeout=10)) == 1
@@ -0,0 +1,27 @@
+# test_worker_pool.py
+
+import os
+import subprocess
+import sys
+
+# Run as the __main__ script, like app.py under Streamlit: no main guard.
+SCRIPT = """
+import os, sys
+sys.path.insert(0, {root!r})
+if __name__ != "__main__":
+    open({marker!r}, "a").write(__name__)
+from src import worker_pool
+print(worker_pool.run(os.getpid) != os.getpid())
+"""
+
+
+def test_workers_do_not_import_the_main_script(tmp_path):
+    marker = tmp_path / "imported"
+    script = tmp_path / "script.py"
+    script.write_text(SCRIPT.format(root=os.getcwd(), marker=str(marker)))
+    env = dict(os.environ, LOAN_WORKERS="2")
+    result = subprocess.run([sys.executable, str(script)], env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "True"
+    assert not marker.exists()